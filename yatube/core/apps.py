@@ -1,5 +1,17 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from django.contrib.auth import get_user_model
+
+        from .auth import invalidate_cached_user
+        from .db import configure_sqlite
+        connection_created.connect(configure_sqlite)
+        user_model = get_user_model()
+        post_save.connect(invalidate_cached_user, sender=user_model)
+        post_delete.connect(invalidate_cached_user, sender=user_model)
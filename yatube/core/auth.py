@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+
+USER_CACHE_PREFIX: str = 'auth-user'
+
+
+def user_cache_key(user_id):
+    return f'{USER_CACHE_PREFIX}:{user_id}'
+
+
+def get_user_cache():
+    """Кеш из AUTH_USER_CACHE или None, если кеш пользователей выключен."""
+    alias = settings.AUTH_USER_CACHE
+    return caches[alias] if alias else None
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который берёт пользователя сессии из кеша: шапка
+    каждой страницы выводит user.username, и без кеша это SELECT на
+    каждый запрос. Хеш сессии по-прежнему сверяется с паролем.
+
+    Кеш должен быть общим для всех воркеров: иначе смена пароля
+    или is_active сбрасывает его только в одном процессе. Без
+    AUTH_USER_CACHE бэкенд работает как ModelBackend.
+    """
+
+    def get_user(self, user_id):
+        user_cache = get_user_cache()
+        if user_cache is None:
+            return super().get_user(user_id)
+        key = user_cache_key(user_id)
+        user = user_cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                user_cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+        return user
+
+
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Сбрасывает кеш при сохранении и удалении пользователя: смена
+    пароля, входа (last_login) и is_active видна сразу."""
+    user_cache = get_user_cache()
+    if user_cache is not None:
+        user_cache.delete(user_cache_key(instance.pk))
@@ -0,0 +1,419 @@
+import logging
+import queue
+import random
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode
+from urllib.error import HTTPError
+from urllib.request import HTTPRedirectHandler, Request, build_opener
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.servers.basehttp import WSGIRequestHandler, WSGIServer
+from django.core.wsgi import get_wsgi_application
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils.crypto import get_random_string
+from faker import Faker
+from mixer.backend.django import mixer
+
+from core.db import configure_sqlite, get_pragmas
+from posts.counters import recount_posts
+from posts.models import Group, Post, User
+
+VIEWS = ('index', 'group_posts', 'profile', 'post_detail', 'post_create')
+READ_VIEWS = VIEWS[:-1]
+# Профили SQLite для смешанной нагрузки: прагмы и CONN_MAX_AGE.
+# default — журнал отката и новое соединение на каждый запрос.
+SQLITE_PROFILES = {
+    'default': ({'journal_mode': 'DELETE', 'synchronous': 'FULL'}, 0),
+    'tuned': (None, None),
+}
+# Профили сессий для запросов залогиненного пользователя: хранилище
+# сессии и бэкенд, который загружает пользователя.
+SESSION_PROFILES = {
+    'db': ('django.contrib.sessions.backends.db',
+           'django.contrib.auth.backends.ModelBackend'),
+    'cached_db': ('django.contrib.sessions.backends.cached_db',
+                  'core.auth.CachedModelBackend'),
+    'signed_cookies': ('django.contrib.sessions.backends.signed_cookies',
+                       'core.auth.CachedModelBackend'),
+}
+
+
+def commit_hash():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def create_dataset(users, groups, posts, seed=0):
+    """Заполняет базу: пользователи и группы через mixer, посты — Faker
+    и bulk_create, счётчики пересчитываются в конце."""
+    fake = Faker('ru_RU')
+    fake.seed_instance(seed)
+    rnd = random.Random(seed)
+    authors = mixer.cycle(users).blend(
+        User, username=mixer.sequence('bench_user{0}'))
+    group_list = mixer.cycle(groups).blend(
+        Group, slug=mixer.sequence('bench-group-{0}'))
+    Post.objects.bulk_create(
+        Post(
+            text=fake.text(max_nb_chars=300),
+            author=rnd.choice(authors),
+            group=rnd.choice(group_list + [None]),
+        )
+        for _ in range(posts)
+    )
+    recount_posts()
+    return {'users': users, 'groups': groups, 'posts': posts}
+
+
+class Targets:
+    """Случайные адреса для каждого представления."""
+
+    def __init__(self, seed=0):
+        self.rnd = random.Random(seed)
+        self.usernames = list(User.objects.values_list('username', flat=True))
+        self.slugs = list(Group.objects.values_list('slug', flat=True))
+        self.post_ids = list(Post.objects.values_list('pk', flat=True))
+        self.pages = max(1, min(5, len(self.post_ids) // 10))
+
+    def request(self, view):
+        """Возвращает (method, url, data)."""
+        page = {'page': self.rnd.randint(1, self.pages)}
+        if view == 'index':
+            return 'get', reverse('posts:index'), page
+        if view == 'group_posts':
+            slug = self.rnd.choice(self.slugs)
+            return 'get', reverse('posts:group_list', args=[slug]), page
+        if view == 'profile':
+            username = self.rnd.choice(self.usernames)
+            return 'get', reverse('posts:profile', args=[username]), page
+        if view == 'post_detail':
+            post_id = self.rnd.choice(self.post_ids)
+            return 'get', reverse('posts:post_detail', args=[post_id]), None
+        return 'post', reverse('posts:post_create'), {
+            'text': f'Пост {get_random_string(8)}'}
+
+
+def summarize(latencies, queries, errors, wall_time):
+    latencies = sorted(latencies)
+
+    def percentile(percent):
+        rank = max(1, -(-percent * len(latencies) // 100))
+        return round(latencies[rank - 1] * 1000, 3)
+
+    return {
+        'requests': len(latencies),
+        'rps': round(len(latencies) / wall_time, 1),
+        'p50_ms': percentile(50),
+        'p95_ms': percentile(95),
+        'p99_ms': percentile(99),
+        'queries_per_request': round(sum(queries) / len(queries), 2),
+        'errors': errors,
+    }
+
+
+def run_client(view, requests, author, seed=0, login=False):
+    """Последовательные запросы через тестовый клиент; login — все
+    запросы от имени author, а не только создание поста."""
+    targets = Targets(seed)
+    client = Client()
+    if login or view == 'post_create':
+        client.force_login(author)
+    latencies, queries, errors = [], [], 0
+    started = time.perf_counter()
+    for _ in range(requests):
+        method, url, data = targets.request(view)
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            response = getattr(client, method)(url, data)
+            latencies.append(time.perf_counter() - start)
+        errors += response.status_code >= 400
+        queries.append(len(captured))
+    return summarize(
+        latencies, queries, errors, time.perf_counter() - started)
+
+
+class CountingApplication:
+    """WSGI-приложение, считающее SQL-запросы каждого ответа."""
+
+    def __init__(self, application):
+        self.application = application
+        self.lock = threading.Lock()
+        self.queries = []
+
+    def __call__(self, environ, start_response):
+        count = [0]
+
+        def wrapper(execute, sql, params, many, context):
+            count[0] += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(wrapper):
+            result = self.application(environ, start_response)
+            content = b''.join(result)
+            getattr(result, 'close', lambda: None)()
+        with self.lock:
+            self.queries.append((environ['REQUEST_METHOD'], count[0]))
+        return [content]
+
+
+class PooledWSGIServer(WSGIServer):
+    """WSGI-сервер с постоянным пулом потоков, как у gthread-воркера:
+    соединение с базой потока переживает запрос при CONN_MAX_AGE > 0."""
+
+    def __init__(self, *args, threads=4, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.requests = queue.Queue()
+        self.workers = [
+            threading.Thread(target=self.work) for _ in range(threads)]
+        for worker in self.workers:
+            worker.start()
+
+    def work(self):
+        while True:
+            item = self.requests.get()
+            if item is None:
+                break
+            request, client_address = item
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+        connections.close_all()
+
+    def process_request(self, request, client_address):
+        self.requests.put((request, client_address))
+
+    def server_close(self):
+        super().server_close()
+        for _ in self.workers:
+            self.requests.put(None)
+        for worker in self.workers:
+            worker.join()
+
+
+class LiveServer:
+    """WSGI-сервер на свободном порту в фоновом потоке."""
+
+    def __init__(self, threads=4):
+        self.application = CountingApplication(get_wsgi_application())
+        self.server = PooledWSGIServer(
+            ('127.0.0.1', 0), QuietHandler, allow_reuse_address=False,
+            threads=threads)
+        self.server.set_app(self.application)
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+        self.thread = threading.Thread(target=self.server.serve_forever)
+
+    def __enter__(self):
+        # Ошибки попадают в отчёт, трассировки 500 в консоли не нужны.
+        logging.disable(logging.ERROR)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        logging.disable(logging.NOTSET)
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class NoRedirect(HTTPRedirectHandler):
+    """Редирект после POST не запрашивается: мерим только сам ответ."""
+
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+def session_cookie(user):
+    client = Client()
+    client.force_login(user)
+    return client.cookies[settings.SESSION_COOKIE_NAME].value
+
+
+def login_headers(author):
+    """Cookie сессии и CSRF-токен для POST от имени author."""
+    token = get_random_string(64)
+    cookie = SimpleCookie()
+    cookie[settings.SESSION_COOKIE_NAME] = session_cookie(author)
+    cookie[settings.CSRF_COOKIE_NAME] = token
+    return {
+        'Cookie': cookie.output(header='', sep=';').strip(),
+        'X-CSRFToken': token,
+    }
+
+
+def fetch_all(plan, headers, concurrency, server):
+    """Выполняет план параллельно; возвращает время прогона и список
+    (method, latency, failed). headers отправляются только с POST."""
+    def fetch(target):
+        method, url, data = target
+        body = None
+        if method == 'get':
+            url += f'?{urlencode(data)}' if data else ''
+        else:
+            body = urlencode(data).encode()
+        request = Request(
+            server.url + url, data=body,
+            headers=headers if method == 'post' else {})
+        start = time.perf_counter()
+        try:
+            with opener.open(request) as response:
+                response.read()
+                status = response.status
+        except HTTPError as error:
+            status = error.code
+        return method, time.perf_counter() - start, status >= 400
+
+    opener = build_opener(NoRedirect)
+    del server.application.queries[:]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        outcomes = list(executor.map(fetch, plan))
+    return time.perf_counter() - started, outcomes
+
+
+def summarize_method(method, outcomes, queries, wall_time):
+    return summarize(
+        [latency for kind, latency, _ in outcomes if kind == method],
+        [count for kind, count in queries if kind == method.upper()],
+        sum(failed for kind, _, failed in outcomes if kind == method),
+        wall_time)
+
+
+def run_http(view, requests, author, concurrency, server, seed=0):
+    """Параллельные запросы по HTTP к живому серверу."""
+    targets = Targets(seed)
+    headers = login_headers(author) if view == 'post_create' else {}
+    plan = [targets.request(view) for _ in range(requests)]
+    wall_time, outcomes = fetch_all(plan, headers, concurrency, server)
+    method = plan[0][0]
+    return summarize_method(
+        method, outcomes, server.application.queries, wall_time)
+
+
+def run_mixed(requests, write_ratio, author, concurrency, server, seed=0):
+    """Чтение лент и постов вперемешку с созданием постов: доля POST
+    равна write_ratio. Отчёт раздельно по чтению и записи."""
+    rnd = random.Random(seed)
+    targets = Targets(seed)
+    plan = [
+        targets.request(
+            'post_create' if rnd.random() < write_ratio
+            else rnd.choice(READ_VIEWS))
+        for _ in range(requests)
+    ]
+    wall_time, outcomes = fetch_all(
+        plan, login_headers(author), concurrency, server)
+    report = {'rps': round(len(outcomes) / wall_time, 1)}
+    for name, method in (('read', 'get'), ('write', 'post')):
+        if any(kind == method for kind, _, _ in outcomes):
+            report[name] = summarize_method(
+                method, outcomes, server.application.queries, wall_time)
+    return report
+
+
+@contextmanager
+def sqlite_profile(name):
+    """Включает профиль SQLITE_PROFILES: прагмы и CONN_MAX_AGE новых
+    соединений. Возвращает фактические значения прагм."""
+    pragmas, max_age = SQLITE_PROFILES[name]
+    database = connections.databases[DEFAULT_DB_ALIAS]
+    old_max_age = database.get('CONN_MAX_AGE', 0)
+    connections.close_all()
+    if max_age is not None:
+        database['CONN_MAX_AGE'] = max_age
+    try:
+        with override_settings(
+                SQLITE_PRAGMAS=settings.SQLITE_PRAGMAS
+                if pragmas is None else pragmas):
+            # journal_mode меняется, только пока других соединений нет:
+            # выставляем его до старта потоков сервера. Соединение
+            # с базой в памяти не закрывается, поэтому прагмы — явно.
+            configure_sqlite(None, connection)
+            applied = get_pragmas(connection, settings.SQLITE_PRAGMAS)
+            applied['conn_max_age'] = database['CONN_MAX_AGE']
+            connections.close_all()
+            yield applied
+    finally:
+        connections.close_all()
+        database['CONN_MAX_AGE'] = old_max_age
+
+
+def run_mixed_profiles(requests=200, write_ratio=0.2, concurrency=4,
+                       profiles=tuple(SQLITE_PROFILES), seed=0):
+    """Смешанная нагрузка на одних данных при каждом профиле SQLite."""
+    author = User.objects.order_by('pk').first()
+    results = {}
+    for name in profiles:
+        with sqlite_profile(name) as applied:
+            cache.clear()
+            with LiveServer(threads=concurrency) as server:
+                report = run_mixed(
+                    requests, write_ratio, author, concurrency, server, seed)
+        results[name] = {'settings': applied, **report}
+    return results
+
+
+def run_session_profiles(requests=100, views=READ_VIEWS,
+                         profiles=tuple(SESSION_PROFILES), seed=0):
+    """Запросы залогиненного пользователя при каждом профиле сессий:
+    сколько запросов к базе уходит на сессию и пользователя."""
+    author = User.objects.order_by('pk').first()
+    results = {}
+    for name in profiles:
+        engine, backend = SESSION_PROFILES[name]
+        # Бенчмарк идёт в одном процессе: locmem для него общий.
+        with override_settings(
+                SESSION_ENGINE=engine, AUTHENTICATION_BACKENDS=[backend],
+                AUTH_USER_CACHE='default'):
+            cache.clear()
+            results[name] = {
+                view: run_client(view, requests, author, seed, login=True)
+                for view in views
+            }
+    return results
+
+
+def run_benchmark(requests=100, concurrency=4, drivers=('client', 'http'),
+                  views=VIEWS, seed=0):
+    """Прогоняет представления каждым драйвером и возвращает отчёт."""
+    author = User.objects.order_by('pk').first()
+    results = {driver: {} for driver in drivers}
+    server = LiveServer(concurrency) if 'http' in drivers else None
+    if server:
+        server.__enter__()
+    try:
+        for view in views:
+            for driver in drivers:
+                cache.clear()
+                if driver == 'client':
+                    results[driver][view] = run_client(
+                        view, requests, author, seed)
+                else:
+                    results[driver][view] = run_http(
+                        view, requests, author, concurrency, server, seed)
+    finally:
+        if server:
+            server.__exit__()
+            connections.close_all()
+    return results
@@ -0,0 +1,144 @@
+import gzip
+import re
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    # Без пакета brotli ответы сжимаются только gzip.
+    brotli = None
+
+# По убыванию выгодности: клиенту отдаётся первая принятая им кодировка.
+ENCODINGS = ('br', 'gzip') if brotli else ('gzip',)
+# Уровни для сжатия один раз: статика при сборке, страницы в кеше.
+MAX_LEVELS = {'br': 11, 'gzip': 9}
+COMPRESSIBLE_TYPES = re.compile(
+    r'^(text/|application/(json|javascript|xml)|image/svg\+xml)')
+
+# Сколько байт потока копить до сброса компрессора клиенту.
+STREAM_FLUSH_SIZE: int = 16 * 1024
+
+_accept_re = re.compile(r'([\w*-]+)\s*(?:;\s*q\s*=\s*([\d.]+))?')
+
+
+def accepted_encodings(request):
+    """Кодировки из Accept-Encoding без явного q=0."""
+    accepted = set()
+    header = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    for part in header.split(','):
+        match = _accept_re.match(part.strip())
+        if match and float(match.group(2) or 1) > 0:
+            accepted.add(match.group(1).lower())
+    return accepted
+
+
+def choose_encoding(request, available=ENCODINGS):
+    accepted = accepted_encodings(request)
+    for encoding in available:
+        if encoding in accepted:
+            return encoding
+    return None
+
+
+def compress(data, encoding, level=None):
+    if level is None:
+        level = MAX_LEVELS[encoding]
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level)
+
+
+def compress_variants(data):
+    """Сжатые копии data во всех кодировках, которые меньше оригинала."""
+    variants = {}
+    for encoding in ENCODINGS:
+        compressed = compress(data, encoding)
+        if len(compressed) < len(data):
+            variants[encoding] = compressed
+    return variants
+
+
+def compress_stream(chunks, encoding, level):
+    """Сжимает поток по частям.
+
+    Компрессор сбрасывается раз в STREAM_FLUSH_SIZE байт входа, а не
+    после каждого куска: каждый сброс закрывает блок, и построчная
+    выгрузка CSV сжималась бы в разы хуже, чем целиком.
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=level)
+        process, flush = compressor.process, compressor.flush
+        finish = compressor.finish
+    else:
+        compressor = zlib.compressobj(
+            level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        process = compressor.compress
+        finish = compressor.flush
+
+        def flush():
+            return compressor.flush(zlib.Z_SYNC_FLUSH)
+    pending = 0
+    for chunk in chunks:
+        data = process(chunk)
+        pending += len(chunk)
+        if pending >= STREAM_FLUSH_SIZE:
+            data += flush()
+            pending = 0
+        if data:
+            yield data
+    yield finish()
+
+
+def set_content_encoding(response, encoding):
+    response['Content-Encoding'] = encoding
+    # Тело уже не совпадает побайтно со своим ETag.
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response['ETag'] = 'W/' + etag
+
+
+class CompressionMiddleware:
+    """Сжимает текстовые ответы с уровнем из COMPRESSION_LEVELS.
+
+    Ответы с Content-Encoding (страницы из кеша лент, статика) уже
+    сжаты заранее и проходят как есть.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self.should_compress(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request)
+        if encoding is None:
+            return response
+        level = settings.COMPRESSION_LEVELS[encoding]
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                response.streaming_content, encoding, level)
+            # Длина сжатого потока заранее неизвестна.
+            del response['Content-Length']
+        else:
+            compressed = compress(response.content, encoding, level)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+        set_content_encoding(response, encoding)
+        return response
+
+    def should_compress(self, response):
+        if response.has_header('Content-Encoding'):
+            return False
+        if response.status_code != 200:
+            return False
+        if not COMPRESSIBLE_TYPES.match(response.get('Content-Type', '')):
+            return False
+        return response.streaming or (
+            len(response.content) >= settings.COMPRESSION_MIN_LENGTH)
@@ -0,0 +1,22 @@
+from django.conf import settings
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """Выставляет SQLITE_PRAGMAS каждому новому соединению с SQLite."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def get_pragmas(connection, names=None):
+    """Текущие значения прагм соединения, для проверки и отчёта."""
+    values = {}
+    with connection.cursor() as cursor:
+        for name in names or settings.SQLITE_PRAGMAS:
+            cursor.execute(f'PRAGMA {name}')
+            row = cursor.fetchone()
+            # Для базы в памяти mmap_size не возвращает строку.
+            values[name] = row[0] if row else None
+    return values
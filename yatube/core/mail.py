@@ -0,0 +1,119 @@
+import logging
+import pickle
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import OutboxMessage, Task
+from .tasks import task
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxEmailBackend(BaseEmailBackend):
+    """Кладёт письма в таблицу OutboxMessage и сразу возвращается.
+
+    Отправляет их send_outbox через OUTBOX_EMAIL_BACKEND: задачей воркера
+    или командой send_outbox.
+    """
+
+    def send_messages(self, email_messages):
+        rows = []
+        for message in email_messages:
+            if not message.recipients():
+                continue
+            connection, message.connection = message.connection, None
+            rows.append(OutboxMessage(
+                subject=message.subject[:255],
+                recipients=', '.join(message.recipients()),
+                message=pickle.dumps(message),
+            ))
+            message.connection = connection
+        if rows:
+            OutboxMessage.objects.bulk_create(rows)
+            schedule_drain()
+        return len(rows)
+
+
+def schedule_drain():
+    """Ставит одну задачу отправки, если такой ещё нет в очереди."""
+    if not Task.objects.filter(
+            name=drain_outbox.task_name, status=Task.PENDING).exists():
+        drain_outbox.delay()
+
+
+def claimable():
+    """Письма в очереди и письма отправителей, упавших посреди пачки."""
+    stale = timezone.now() - timedelta(seconds=settings.OUTBOX_LOCK_TIMEOUT)
+    return OutboxMessage.objects.filter(
+        Q(status=OutboxMessage.PENDING)
+        | Q(status=OutboxMessage.SENDING, locked_at__lt=stale)
+    )
+
+
+def claim_batch(batch_size, after=0):
+    """Забирает пачку писем меткой этого запуска: UPDATE с повторной
+    проверкой условия достаётся одному отправителю, второй получает
+    только то, что обновил сам."""
+    pks = list(claimable().filter(
+        pk__gt=after).values_list('pk', flat=True)[:batch_size])
+    token = uuid.uuid4().hex
+    claimable().filter(pk__in=pks).update(
+        status=OutboxMessage.SENDING, claim=token, locked_at=timezone.now())
+    return list(OutboxMessage.objects.filter(claim=token))
+
+
+def send_batch(batch, connection):
+    """Отправляет пачку писем через одно соединение.
+
+    Возвращает число писем, которые не удалось отправить.
+    """
+    sent, failed = [], 0
+    for row in batch:
+        try:
+            connection.send_messages([pickle.loads(row.message)])
+        except Exception as error:
+            failed += 1
+            row.attempts += 1
+            row.last_error = repr(error)
+            row.status = (
+                OutboxMessage.FAILED
+                if row.attempts >= settings.OUTBOX_MAX_ATTEMPTS
+                else OutboxMessage.PENDING
+            )
+            row.save(update_fields=('attempts', 'last_error', 'status'))
+            logger.warning('Письмо %s не отправлено: %r', row.pk, error)
+        else:
+            sent.append(row.pk)
+    OutboxMessage.objects.filter(pk__in=sent).update(
+        status=OutboxMessage.SENT, sent_at=timezone.now())
+    return failed
+
+
+def send_outbox(batch_size=None):
+    """Отправляет накопившиеся письма пачками по OUTBOX_BATCH_SIZE,
+    открывая одно соединение на пачку. Каждое письмо пробуется не больше
+    раза за вызов. Возвращает (отправлено, с ошибкой)."""
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    total = failed = last_pk = 0
+    while True:
+        batch = claim_batch(batch_size, after=last_pk)
+        if not batch:
+            return total - failed, failed
+        with get_connection(settings.OUTBOX_EMAIL_BACKEND) as connection:
+            failed += send_batch(batch, connection)
+        total += len(batch)
+        last_pk = batch[-1].pk
+
+
+@task()
+def drain_outbox():
+    sent, failed = send_outbox()
+    if failed:
+        # Очередь задач повторит отправку с нарастающей задержкой.
+        raise RuntimeError(f'Не отправлено писем: {failed}')
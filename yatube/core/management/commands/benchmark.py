@@ -0,0 +1,122 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from core.benchmark import (READ_VIEWS, SESSION_PROFILES, SQLITE_PROFILES,
+                            VIEWS, commit_hash, create_dataset,
+                            run_benchmark, run_mixed_profiles,
+                            run_session_profiles)
+from core.testing import NO_CACHE
+
+
+class Command(BaseCommand):
+    help = ('Нагрузочный прогон лент, поста и создания поста на временной '
+            'базе; отчёт в JSON для сравнения между коммитами.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--groups', type=int, default=10)
+        parser.add_argument('--posts', type=int, default=5000)
+        parser.add_argument(
+            '--requests', type=int, default=200,
+            help='Запросов на каждое представление и драйвер.')
+        parser.add_argument(
+            '--concurrency', type=int, default=4,
+            help='Потоков HTTP-драйвера.')
+        parser.add_argument(
+            '--drivers', default='client,http',
+            help='Через запятую: client, http.')
+        parser.add_argument(
+            '--views', default=','.join(VIEWS),
+            help='Через запятую из: ' + ', '.join(VIEWS))
+        parser.add_argument(
+            '--mixed', action='store_true',
+            help=('Вместо прогона по представлениям: чтение вперемешку '
+                  'с записью по HTTP для каждого профиля SQLite.'))
+        parser.add_argument(
+            '--write-ratio', type=float, default=0.2,
+            help='Доля POST в смешанной нагрузке.')
+        parser.add_argument(
+            '--profiles', default=','.join(SQLITE_PROFILES),
+            help='Через запятую из: ' + ', '.join(SQLITE_PROFILES))
+        parser.add_argument(
+            '--sessions', action='store_true',
+            help=('Вместо прогона по представлениям: чтение залогиненным '
+                  'пользователем при каждом хранилище сессий.'))
+        parser.add_argument(
+            '--session-profiles', default=','.join(SESSION_PROFILES),
+            help='Через запятую из: ' + ', '.join(SESSION_PROFILES))
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--no-cache', action='store_true',
+            help='Отключить кеш, чтобы мерить холодный рендер.')
+        parser.add_argument('--output', help='Файл отчёта; иначе stdout.')
+
+    def handle(self, *args, **options):
+        drivers = options['drivers'].split(',')
+        views = options['views'].split(',')
+        profiles = options['profiles'].split(',')
+        session_profiles = options['session_profiles'].split(',')
+        unknown = (set(drivers) - {'client', 'http'} | set(views) - set(VIEWS)
+                   | set(profiles) - set(SQLITE_PROFILES)
+                   | set(session_profiles) - set(SESSION_PROFILES))
+        if unknown:
+            raise CommandError(f'Неизвестные значения: {sorted(unknown)}')
+        if options['users'] < 1 or options['groups'] < 1:
+            raise CommandError('Нужен хотя бы один пользователь и группа.')
+
+        tmp_dir = tempfile.mkdtemp()
+        test_settings = connection.settings_dict.setdefault('TEST', {})
+        test_settings['NAME'] = os.path.join(tmp_dir, 'benchmark.sqlite3')
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False)
+        try:
+            dataset = create_dataset(
+                options['users'], options['groups'], options['posts'],
+                seed=options['seed'])
+            with override_settings(
+                    **({'CACHES': NO_CACHE} if options['no_cache'] else {})):
+                if options['sessions']:
+                    results = {'sessions': run_session_profiles(
+                        requests=options['requests'],
+                        views=[view for view in views if view in READ_VIEWS],
+                        profiles=session_profiles, seed=options['seed'])}
+                elif options['mixed']:
+                    results = {'mixed': run_mixed_profiles(
+                        requests=options['requests'],
+                        write_ratio=options['write_ratio'],
+                        concurrency=options['concurrency'],
+                        profiles=profiles, seed=options['seed'])}
+                else:
+                    results = run_benchmark(
+                        requests=options['requests'],
+                        concurrency=options['concurrency'],
+                        drivers=drivers, views=views, seed=options['seed'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            # В WAL рядом с базой остаются файлы -wal и -shm.
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        report = json.dumps({
+            'commit': commit_hash(),
+            'created': timezone.now().isoformat(),
+            'dataset': dataset,
+            'options': {
+                'requests': options['requests'],
+                'concurrency': options['concurrency'],
+                'cache': not options['no_cache'],
+                'seed': options['seed'],
+            },
+            'results': results,
+        }, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(report + '\n')
+        else:
+            self.stdout.write(report)
@@ -0,0 +1,37 @@
+import os
+
+from django.contrib.staticfiles.storage import (ManifestStaticFilesStorage,
+                                                staticfiles_storage)
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from core.staticfiles import SUFFIXES
+
+
+class Command(BaseCommand):
+    help = ('Собирает статику через collectstatic: хеши в именах, манифест '
+            'для {% static %} и сжатые варианты файлов.')
+
+    def handle(self, *args, **options):
+        if not isinstance(staticfiles_storage, ManifestStaticFilesStorage):
+            raise CommandError(
+                'STATICFILES_STORAGE без манифеста: запустите с '
+                'DJANGO_SETTINGS_MODULE=yatube.settings_production.')
+        call_command('collectstatic', interactive=False, verbosity=0)
+        staticfiles_storage.load_manifest()
+        hashed = set(staticfiles_storage.hashed_files.values())
+        original_size = compressed_size = variants = 0
+        for name in hashed:
+            path = staticfiles_storage.path(name)
+            for suffix in SUFFIXES.values():
+                if os.path.isfile(path + suffix):
+                    variants += 1
+                    original_size += os.path.getsize(path)
+                    compressed_size += os.path.getsize(path + suffix)
+        self.stdout.write(
+            f'Файлов с хешем: {len(hashed)}, сжатых вариантов: {variants}')
+        if variants:
+            self.stdout.write(
+                f'Сжатые варианты: {compressed_size} байт '
+                f'вместо {original_size}')
+        self.stdout.write(f'Манифест: {staticfiles_storage.manifest_name}')
@@ -0,0 +1,34 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from core.metrics import METRICS, PERCENTILES, summarize
+
+
+class Command(BaseCommand):
+    help = 'Показывает перцентили метрик запросов по представлениям.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours', type=float, default=24,
+            help='За сколько последних часов брать замеры.')
+        parser.add_argument(
+            '--json', action='store_true', help='Вывести сводку в JSON.')
+
+    def handle(self, *args, **options):
+        summary = summarize(hours=options['hours'])
+        if options['json']:
+            self.stdout.write(json.dumps(summary, indent=2))
+            return
+        if not summary:
+            self.stdout.write('Замеров нет.')
+            return
+        for view, data in summary.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{view} (запросов: {data["count"]})'))
+            for name in METRICS:
+                values = ' '.join(
+                    f'p{percent}={data[name][f"p{percent}"]:.1f}'
+                    for percent in PERCENTILES
+                )
+                self.stdout.write(f'  {name}: {values}')
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.tasks import purge_done, run_pending
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из таблицы core.Task.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и выйти.')
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--interval', type=float, default=1.0,
+            help='Пауза в секундах, когда очередь пуста.')
+
+    def handle(self, *args, **options):
+        verbosity = options['verbosity']
+        purge_done()
+        total = 0
+        try:
+            while True:
+                processed = run_pending(limit=options['batch_size'])
+                total += processed
+                if processed and verbosity > 1:
+                    self.stdout.write(f'Выполнено задач: {processed}')
+                if not processed:
+                    if options['once']:
+                        break
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        if verbosity:
+            self.stdout.write(f'Всего выполнено задач: {total}')
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from core.mail import send_outbox
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди core.OutboxMessage пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int,
+            help='Писем на одно соединение; по умолчанию OUTBOX_BATCH_SIZE.')
+
+    def handle(self, *args, **options):
+        sent, failed = send_outbox(options['batch_size'])
+        self.stdout.write(f'Отправлено писем: {sent}, с ошибкой: {failed}.')
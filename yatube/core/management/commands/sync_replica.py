@@ -0,0 +1,38 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.routers import sync_replicas
+
+
+class Command(BaseCommand):
+    help = ('Копирует основную базу SQLite в реплики из DATABASE_REPLICAS '
+            'для локальной проверки чтения с реплик.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float,
+            help='Повторять копирование каждые N секунд.')
+
+    def handle(self, *args, **options):
+        aliases = ['default', *settings.DATABASE_REPLICAS]
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError(
+                'Реплики не настроены: задайте YATUBE_DB_REPLICA.')
+        if any(connections[alias].vendor != 'sqlite' for alias in aliases):
+            raise CommandError('Команда поддерживает только SQLite.')
+        try:
+            while True:
+                start = time.perf_counter()
+                synced = sync_replicas()
+                if options['verbosity']:
+                    self.stdout.write(
+                        f'Реплики {", ".join(synced)} обновлены за '
+                        f'{(time.perf_counter() - start) * 1000:.0f} мс')
+                if not options['interval']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
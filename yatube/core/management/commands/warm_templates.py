@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from core.templating import (copy_engine, get_engine, time_render,
+                             warm_templates)
+from core.testing import NO_CACHE
+from posts.models import Post
+from posts.utils import NUM_OF_PUBLICATIONS, CountedPaginator
+
+FEED_TEMPLATE: str = 'posts/index.html'
+
+
+class Command(BaseCommand):
+    help = ('Компилирует все шаблоны и проверяет их; с --benchmark '
+            'сравнивает рендер ленты с cached-загрузчиком и без него.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--benchmark', action='store_true')
+        parser.add_argument('--repeat', type=int, default=100)
+
+    def handle(self, *args, **options):
+        count, elapsed, errors = warm_templates()
+        if errors:
+            raise CommandError(
+                'Шаблоны с ошибками:\n' + '\n'.join(errors))
+        self.stdout.write(
+            f'Скомпилировано шаблонов: {count} за {elapsed * 1000:.1f} мс')
+        if options['benchmark']:
+            self.benchmark(options['repeat'])
+
+    def benchmark(self, repeat):
+        page = CountedPaginator(
+            Post.objects.for_feed(), NUM_OF_PUBLICATIONS).page(1)
+        context = {'page_obj': page}
+        engine = get_engine()
+        with override_settings(CACHES=NO_CACHE):
+            context['page_obj'].object_list = list(page.object_list)
+            results = {}
+            for name, cached in (('без кеша', False), ('cached', True)):
+                copy = copy_engine(engine, cached)
+                # Первый рендер разбирает шаблоны: для cached это работа
+                # warm_templates при старте, а не запроса.
+                time_render(copy, FEED_TEMPLATE, context, 1)
+                results[name] = time_render(
+                    copy, FEED_TEMPLATE, context, repeat)
+        for name, ms in results.items():
+            self.stdout.write(f'{FEED_TEMPLATE}, {name}: {ms:.2f} мс')
+        self.stdout.write(
+            f'Разбор шаблонов в запросе: '
+            f'{results["без кеша"] - results["cached"]:.2f} мс')
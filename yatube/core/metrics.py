@@ -0,0 +1,144 @@
+import threading
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template.backends import django as django_backend
+from django.utils import timezone
+
+from .models import RequestSample
+
+METRICS = ('query_count', 'db_time', 'template_time', 'total_time',
+           'response_size')
+PERCENTILES = (50, 95, 99)
+
+_current = ContextVar('request_metrics', default=None)
+_buffer = []
+_buffer_lock = threading.Lock()
+
+
+class Measurement:
+    def __init__(self):
+        self.query_count = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_count += 1
+            self.db_time += (time.perf_counter() - start) * 1000
+
+
+def _instrument_templates():
+    """Оборачивает рендер шаблонов верхнего уровня (include не считаются
+    повторно), время добавляется к текущему замеру."""
+    template_class = django_backend.Template
+    if getattr(template_class.render, 'measured', False):
+        return
+    original = template_class.render
+
+    def render(self, context=None, request=None):
+        measurement = _current.get()
+        if measurement is None:
+            return original(self, context, request)
+        start = time.perf_counter()
+        try:
+            return original(self, context, request)
+        finally:
+            measurement.template_time += (time.perf_counter() - start) * 1000
+
+    render.measured = True
+    template_class.render = render
+
+
+def flush():
+    with _buffer_lock:
+        samples = _buffer[:]
+        _buffer.clear()
+    if samples:
+        RequestSample.objects.bulk_create(samples)
+    return len(samples)
+
+
+class RequestMetricsMiddleware:
+    """Пишет для каждого запроса число и время запросов к БД, время
+    рендера шаблонов и размер ответа. Включается REQUEST_METRICS_ENABLED,
+    замеры сохраняются пачками по REQUEST_METRICS_FLUSH_SIZE."""
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        _instrument_templates()
+
+    def __call__(self, request):
+        measurement = Measurement()
+        token = _current.set(measurement)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(measurement))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total_time = (time.perf_counter() - start) * 1000
+        match = request.resolver_match
+        if match is None:
+            return response
+        with _buffer_lock:
+            _buffer.append(RequestSample(
+                view=match.view_name,
+                method=request.method,
+                status=response.status_code,
+                query_count=measurement.query_count,
+                db_time=measurement.db_time,
+                template_time=measurement.template_time,
+                total_time=total_time,
+                response_size=(
+                    0 if response.streaming else len(response.content)),
+                created=timezone.now(),
+            ))
+            full = len(_buffer) >= settings.REQUEST_METRICS_FLUSH_SIZE
+        if full:
+            flush()
+        return response
+
+
+def percentile(values, percent):
+    """Перцентиль по ближайшему рангу для отсортированного списка."""
+    if not values:
+        return None
+    rank = max(1, -(-percent * len(values) // 100))
+    return values[rank - 1]
+
+
+def summarize(hours=24):
+    """Перцентили метрик по каждому представлению за последние hours."""
+    flush()
+    since = timezone.now() - timedelta(hours=hours)
+    samples = {}
+    rows = RequestSample.objects.filter(created__gte=since).values_list(
+        'view', *METRICS)
+    for view, *values in rows.iterator():
+        columns = samples.setdefault(view, [[] for _ in METRICS])
+        for column, value in zip(columns, values):
+            column.append(value)
+    summary = {}
+    for view, columns in sorted(samples.items()):
+        summary[view] = {'count': len(columns[0])}
+        for name, column in zip(METRICS, columns):
+            column.sort()
+            summary[view][name] = {
+                f'p{percent}': percentile(column, percent)
+                for percent in PERCENTILES
+            }
+    return summary
@@ -0,0 +1,34 @@
+# Generated by Django 2.2.16 on 2026-10-18 05:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestSample',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('view', models.CharField(db_index=True, max_length=200, verbose_name='Представление')),
+                ('method', models.CharField(max_length=10, verbose_name='Метод')),
+                ('status', models.PositiveSmallIntegerField(verbose_name='Код ответа')),
+                ('query_count', models.PositiveIntegerField(verbose_name='Запросов к БД')),
+                ('db_time', models.FloatField(verbose_name='Время БД, мс')),
+                ('template_time', models.FloatField(verbose_name='Время шаблонов, мс')),
+                ('total_time', models.FloatField(verbose_name='Общее время, мс')),
+                ('response_size', models.PositiveIntegerField(verbose_name='Размер ответа, байт')),
+                ('created', models.DateTimeField(db_index=True, verbose_name='Время запроса')),
+            ],
+            options={
+                'verbose_name': 'Замер запроса',
+                'verbose_name_plural': 'Замеры запросов',
+                'ordering': ['-created'],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.16 on 2026-10-18 06:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_outboxmessage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxmessage',
+            name='claim',
+            field=models.CharField(blank=True, db_index=True, max_length=32, verbose_name='Метка отправителя'),
+        ),
+        migrations.AddField(
+            model_name='outboxmessage',
+            name='locked_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Взято в работу'),
+        ),
+    ]
@@ -0,0 +1,99 @@
+from django.db import models
+
+
+class RequestSample(models.Model):
+    view = models.CharField('Представление', max_length=200, db_index=True)
+    method = models.CharField('Метод', max_length=10)
+    status = models.PositiveSmallIntegerField('Код ответа')
+    query_count = models.PositiveIntegerField('Запросов к БД')
+    db_time = models.FloatField('Время БД, мс')
+    template_time = models.FloatField('Время шаблонов, мс')
+    total_time = models.FloatField('Общее время, мс')
+    response_size = models.PositiveIntegerField('Размер ответа, байт')
+    created = models.DateTimeField('Время запроса', db_index=True)
+
+    class Meta:
+        ordering = ['-created']
+        verbose_name = 'Замер запроса'
+        verbose_name_plural = 'Замеры запросов'
+
+    def __str__(self):
+        return f'{self.view} {self.total_time:.1f} мс'
+
+
+class Task(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField('Задача', max_length=200)
+    kwargs = models.TextField('Аргументы (JSON)', default='{}')
+    status = models.CharField(
+        'Статус', max_length=10, choices=STATUSES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    max_attempts = models.PositiveSmallIntegerField(
+        'Максимум попыток', default=3)
+    run_at = models.DateTimeField('Запустить после')
+    locked_at = models.DateTimeField('Взята в работу', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created = models.DateTimeField('Создана', auto_now_add=True)
+
+    class Meta:
+        ordering = ['run_at', 'id']
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        indexes = [
+            models.Index(
+                fields=['status', 'run_at', 'id'],
+                name='task_status_run_at_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} ({self.get_status_display()})'
+
+
+class OutboxMessage(models.Model):
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'Ждёт отправки'),
+        (SENDING, 'Отправляется'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Ошибка'),
+    )
+
+    subject = models.CharField('Тема', max_length=255)
+    recipients = models.TextField('Получатели')
+    # EmailMessage целиком (pickle): вложения и HTML-версии сохраняются.
+    message = models.BinaryField('Письмо')
+    status = models.CharField(
+        'Статус', max_length=10, choices=STATUSES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    # Метка запуска send_outbox, который забрал письмо.
+    claim = models.CharField(
+        'Метка отправителя', max_length=32, blank=True, db_index=True)
+    locked_at = models.DateTimeField('Взято в работу', null=True, blank=True)
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = [
+            models.Index(
+                fields=['status', 'id'], name='outbox_status_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} → {self.recipients}'
@@ -0,0 +1,81 @@
+import random
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_SESSION_KEY: str = 'db_pinned'
+# Сессии и пользователи читаются на каждом запросе сразу после записи
+# (вход, регистрация): с отстающей реплики их не прочитать.
+PRIMARY_ONLY_APPS = ('auth', 'sessions', 'contenttypes', 'core')
+
+_replica = ContextVar('db_replica', default=None)
+
+
+def pin_primary(request):
+    """Дальше в этой сессии все чтения идут с основной базы: пользователь
+    видит свои изменения, даже если реплика отстаёт."""
+    request.session[PIN_SESSION_KEY] = True
+
+
+def is_pinned(request):
+    session = getattr(request, 'session', None)
+    return bool(session and session.get(PIN_SESSION_KEY))
+
+
+def use_replica(view):
+    """Чтения представления идут с реплики из DATABASE_REPLICAS, если
+    они настроены и сессия не закреплена за основной базой."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or is_pinned(request):
+            return view(request, *args, **kwargs)
+        token = _replica.set(random.choice(replicas))
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _replica.reset(token)
+    return wrapper
+
+
+def cache_timeout(timeout):
+    """Прочитанное с реплики могло отстать от основной базы: такие данные
+    кешируются не дольше DATABASE_REPLICA_CACHE_TIMEOUT."""
+    if _replica.get() is None:
+        return timeout
+    limit = settings.DATABASE_REPLICA_CACHE_TIMEOUT
+    return limit if timeout is None else min(timeout, limit)
+
+
+class PrimaryReplicaRouter:
+    """Запись и миграции — на основную базу, чтение внутри use_replica —
+    на выбранную реплику."""
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return DEFAULT_DB_ALIAS
+        return _replica.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии основной базы: связи между ними допустимы.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+def sync_replicas():
+    """Копирует основную базу SQLite в каждую реплику через backup API.
+    Открытые соединения реплик видят новые данные сразу."""
+    source = connections[DEFAULT_DB_ALIAS]
+    source.ensure_connection()
+    for alias in settings.DATABASE_REPLICAS:
+        target = connections[alias]
+        target.ensure_connection()
+        source.connection.backup(target.connection)
+    return list(settings.DATABASE_REPLICAS)
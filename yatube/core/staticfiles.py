@@ -0,0 +1,88 @@
+import mimetypes
+import os
+import posixpath
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import (ManifestStaticFilesStorage,
+                                                staticfiles_storage)
+from django.core.files.base import ContentFile
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from .compression import ENCODINGS, accepted_encodings, compress_variants
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.svg', '.txt', '.html', '.json', '.xml', '.ico', '.map')
+SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+IMMUTABLE_CACHE_CONTROL: str = 'public, max-age=31536000, immutable'
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Хеширует имена файлов, пишет манифест для {% static %} и кладёт
+    рядом с каждым хешированным текстовым файлом .gz и .br варианты."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for hashed_name in sorted(set(self.hashed_files.values())):
+            for variant in self.compress(hashed_name):
+                yield hashed_name, variant, True
+
+    def compress(self, name):
+        if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+            return
+        with self.open(name) as original:
+            data = original.read()
+        for encoding, compressed in compress_variants(data).items():
+            suffix = SUFFIXES[encoding]
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            yield self._save(name + suffix, ContentFile(compressed))
+
+
+def is_hashed(path):
+    """Имя из манифеста: содержимое по нему никогда не меняется."""
+    hashed_files = getattr(staticfiles_storage, 'hashed_files', {})
+    return path in hashed_files.values()
+
+
+def serve(request, path):
+    """Отдаёт собранную статику из STATIC_ROOT. Хешированные файлы
+    кешируются клиентом на год, сжатый вариант выбирается по
+    Accept-Encoding без сжатия на лету."""
+    path = posixpath.normpath(path).lstrip('/')
+    try:
+        fullpath = safe_join(settings.STATIC_ROOT, path)
+    except ValueError:
+        raise Http404('Файл не найден.')
+    if not os.path.isfile(fullpath):
+        raise Http404('Файл не найден.')
+    stat = os.stat(fullpath)
+    if not was_modified_since(
+            request.META.get('HTTP_IF_MODIFIED_SINCE'),
+            stat.st_mtime, stat.st_size):
+        return HttpResponseNotModified()
+    content_type, _ = mimetypes.guess_type(fullpath)
+    accepted = accepted_encodings(request)
+    encoding = None
+    for name in ENCODINGS:
+        if name in accepted and os.path.isfile(fullpath + SUFFIXES[name]):
+            fullpath += SUFFIXES[name]
+            encoding = name
+            break
+    response = FileResponse(
+        open(fullpath, 'rb'),
+        content_type=content_type or 'application/octet-stream')
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Vary'] = 'Accept-Encoding'
+    if encoding:
+        response['Content-Encoding'] = encoding
+    if is_hashed(path):
+        response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    else:
+        response['Cache-Control'] = (
+            f'public, max-age={settings.STATIC_MAX_AGE}')
+    return response
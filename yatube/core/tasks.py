@@ -0,0 +1,113 @@
+import json
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+
+
+def task(max_attempts=3):
+    """Регистрирует функцию как фоновую задачу.
+
+    func.delay(**kwargs) сохраняет задачу в таблицу в текущей транзакции:
+    воркер увидит её только после коммита. Аргументы должны
+    сериализоваться в JSON.
+    """
+    def decorator(func):
+        name = f'{func.__module__}.{func.__name__}'
+        registry[name] = func
+
+        def delay(**kwargs):
+            return enqueue(name, kwargs, max_attempts=max_attempts)
+
+        func.delay = delay
+        func.task_name = name
+        return func
+    return decorator
+
+
+def enqueue(name, kwargs, max_attempts=3):
+    queued = Task.objects.create(
+        name=name,
+        kwargs=json.dumps(kwargs),
+        max_attempts=max_attempts,
+        run_at=timezone.now(),
+    )
+    if settings.TASKS_EAGER:
+        execute(queued)
+    return queued
+
+
+def get_function(name):
+    if name not in registry:
+        # Модуль с задачей мог ещё не импортироваться в этом процессе.
+        import_string(name)
+    return registry[name]
+
+
+def claim(queued):
+    """Берёт задачу в работу; False, если её уже взял другой воркер."""
+    claimed = Task.objects.filter(
+        pk=queued.pk, status=queued.status, locked_at=queued.locked_at
+    ).update(status=Task.RUNNING, locked_at=timezone.now())
+    return claimed == 1
+
+
+def execute(queued):
+    """Выполняет задачу; при ошибке переносит её с задержкой
+    TASKS_RETRY_DELAY * 2 ** (попытка - 1) или помечает FAILED."""
+    queued.attempts += 1
+    try:
+        get_function(queued.name)(**json.loads(queued.kwargs))
+    except Exception:
+        queued.last_error = traceback.format_exc()
+        if queued.attempts < queued.max_attempts:
+            queued.status = Task.PENDING
+            delay = settings.TASKS_RETRY_DELAY * 2 ** (queued.attempts - 1)
+            queued.run_at = timezone.now() + timedelta(seconds=delay)
+        else:
+            queued.status = Task.FAILED
+            logger.error(
+                'Задача %s не выполнена', queued.name, exc_info=True)
+    else:
+        queued.status = Task.DONE
+    queued.locked_at = None
+    queued.save(update_fields=(
+        'status', 'attempts', 'run_at', 'locked_at', 'last_error'))
+    return queued.status == Task.DONE
+
+
+def due_tasks(limit):
+    """Задачи, срок которых наступил, и задачи упавших воркеров."""
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.TASKS_LOCK_TIMEOUT)
+    return Task.objects.filter(
+        Q(status=Task.PENDING, run_at__lte=now)
+        | Q(status=Task.RUNNING, locked_at__lt=stale)
+    )[:limit]
+
+
+def run_pending(limit=100):
+    """Выполняет до limit задач и возвращает число взятых в работу."""
+    processed = 0
+    for queued in due_tasks(limit):
+        if claim(queued):
+            execute(queued)
+            processed += 1
+    return processed
+
+
+def purge_done(days=7):
+    border = timezone.now() - timedelta(days=days)
+    deleted, _ = Task.objects.filter(
+        status=Task.DONE, run_at__lt=border).delete()
+    return deleted
@@ -0,0 +1,75 @@
+import os
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.template import (Engine, RequestContext, TemplateDoesNotExist,
+                             TemplateSyntaxError, engines)
+from django.test import RequestFactory
+
+CACHED_LOADER: str = 'django.template.loaders.cached.Loader'
+
+
+def get_engine():
+    return engines['django'].engine
+
+
+def template_names(engine):
+    """Имена всех шаблонов из каталогов, которые видят загрузчики."""
+    names = []
+    for loader in engine.template_loaders:
+        for directory_loader in getattr(loader, 'loaders', [loader]):
+            for directory in directory_loader.get_dirs():
+                for root, _, files in os.walk(directory):
+                    for filename in files:
+                        path = os.path.join(root, filename)
+                        names.append(os.path.relpath(path, directory))
+    return list(dict.fromkeys(name.replace(os.sep, '/') for name in names))
+
+
+def warm_templates(engine=None):
+    """Компилирует все шаблоны; с cached-загрузчиком они остаются
+    в памяти процесса. Возвращает (число шаблонов, секунды, ошибки)."""
+    engine = engine or get_engine()
+    errors = []
+    names = template_names(engine)
+    start = time.perf_counter()
+    for name in names:
+        try:
+            engine.get_template(name)
+        except (TemplateSyntaxError, TemplateDoesNotExist,
+                UnicodeDecodeError) as error:
+            errors.append(f'{name}: {error}')
+    return len(names), time.perf_counter() - start, errors
+
+
+def copy_engine(engine, cached):
+    """Копия движка с cached-загрузчиком или без него: без кеша шаблоны
+    читаются с диска и разбираются при каждом get_template."""
+    loaders = []
+    for loader in engine.loaders:
+        if isinstance(loader, (tuple, list)) and loader[0] == CACHED_LOADER:
+            loaders.extend(loader[1])
+        else:
+            loaders.append(loader)
+    if cached:
+        loaders = [(CACHED_LOADER, loaders)]
+    return Engine(
+        dirs=engine.dirs,
+        context_processors=engine.context_processors,
+        debug=engine.debug,
+        loaders=loaders,
+        string_if_invalid=engine.string_if_invalid,
+        file_charset=engine.file_charset,
+        libraries=engine.libraries,
+        autoescape=engine.autoescape,
+    )
+
+
+def time_render(engine, name, context, repeat):
+    """Среднее время get_template и рендера name в миллисекундах."""
+    request = RequestFactory().get('/')
+    request.user = AnonymousUser()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        engine.get_template(name).render(RequestContext(request, context))
+    return (time.perf_counter() - start) / repeat * 1000
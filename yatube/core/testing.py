@@ -0,0 +1,57 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Кеш, который ничего не хранит: замеры и проверки команд видят
+# запросы холодного рендера, а не страницы из кеша.
+NO_CACHE = {
+    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+}
+
+
+class Rollback(Exception):
+    """Откатывает transaction.atomic() с временными данными команды."""
+
+
+class QueryBudgetMixin:
+    """Проверки числа SQL-запросов для TestCase.
+
+    Кеш очищается перед каждым замером, чтобы считать холодный рендер,
+    а при превышении бюджета в сообщение попадают все запросы.
+    """
+
+    def assertQueryBudget(self, budget, client, url, method='get',
+                          data=None, status=None):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(client, method)(url, data)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        if status is not None:
+            self.assertEqual(response.status_code, status, url)
+        if len(queries) > budget:
+            sql = '\n'.join(
+                f'{number}. {query["sql"]}'
+                for number, query in enumerate(queries.captured_queries, 1)
+            )
+            self.fail(
+                f'{method.upper()} {url}: {len(queries)} запросов '
+                f'при бюджете {budget}\n{sql}'
+            )
+        return len(queries)
+
+    def assertBudgetStable(self, budget, client, url, grow, sizes=(1, 15),
+                           **kwargs):
+        """Бюджет соблюдается и число запросов не растёт с числом постов.
+
+        grow(size) доводит число постов до size перед замером.
+        """
+        counts = []
+        for size in sizes:
+            grow(size)
+            with self.subTest(url=url, posts=size):
+                counts.append(
+                    self.assertQueryBudget(budget, client, url, **kwargs))
+        self.assertLessEqual(
+            len(set(counts)), 1,
+            f'{url}: число запросов зависит от числа постов {counts}')
@@ -0,0 +1,547 @@
+import gzip
+import json
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db import connection
+from django.http import Http404
+from django.templatetags.static import static
+from django.test import (Client, RequestFactory, TestCase,
+                         TransactionTestCase, override_settings)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.auth import user_cache_key
+from core.benchmark import (create_dataset, run_benchmark,
+                            run_session_profiles, sqlite_profile)
+from core.compression import (STREAM_FLUSH_SIZE, accepted_encodings,
+                              compress_stream)
+from core.db import get_pragmas
+from core import mail as outbox
+from core.mail import claim_batch, send_outbox
+from core.metrics import summarize
+from core.models import OutboxMessage, RequestSample, Task
+from core.routers import (PIN_SESSION_KEY, PrimaryReplicaRouter, cache_timeout,
+                          use_replica)
+from core.staticfiles import IMMUTABLE_CACHE_CONTROL, serve
+from core.tasks import run_pending, task
+from core.templating import (CACHED_LOADER, copy_engine, get_engine,
+                             template_names, warm_templates)
+from posts.models import Post, User
+from yatube.settings_production import TEMPLATES as PRODUCTION_TEMPLATES
+
+
+@override_settings(
+    REQUEST_METRICS_ENABLED=True, REQUEST_METRICS_FLUSH_SIZE=1)
+class RequestMetricsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        Post.objects.create(author=cls.user, text='Тестовый пост')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_sample_recorded_per_view(self):
+        """Замер пишется под именем представления с метриками ответа."""
+        response = self.guest_client.get(reverse('posts:index'))
+        sample = RequestSample.objects.get()
+        self.assertEqual(sample.view, 'posts:index')
+        self.assertEqual(sample.status, 200)
+        self.assertGreater(sample.query_count, 0)
+        self.assertGreater(sample.template_time, 0)
+        self.assertEqual(sample.response_size, len(response.content))
+
+    @override_settings(REQUEST_METRICS_ENABLED=False)
+    def test_disabled_by_default(self):
+        """Без настройки замеры не пишутся."""
+        self.guest_client.get(reverse('posts:index'))
+        self.assertFalse(RequestSample.objects.exists())
+
+    @override_settings(REQUEST_METRICS_FLUSH_SIZE=10)
+    def test_samples_are_buffered(self):
+        """Замеры копятся в памяти и сохраняются пачкой."""
+        for _ in range(3):
+            self.guest_client.get(reverse('about:author'))
+        self.assertFalse(RequestSample.objects.exists())
+        summary = summarize()
+        self.assertEqual(summary['about:author']['count'], 3)
+        self.assertEqual(
+            summary['about:author']['query_count']['p99'], 0)
+
+    def test_metrics_command_and_endpoint(self):
+        """Перцентили доступны командой и только staff через JSON."""
+        self.guest_client.get(reverse('posts:index'))
+        out = StringIO()
+        call_command('request_metrics', json=True, stdout=out)
+        self.assertIn('posts:index', json.loads(out.getvalue()))
+        response = self.guest_client.get(reverse('core:metrics'))
+        self.assertEqual(response.status_code, 302)
+        staff_client = Client()
+        staff_client.force_login(self.staff)
+        response = staff_client.get(reverse('core:metrics'))
+        self.assertIn('posts:index', response.json())
+        self.assertEqual(
+            response.json()['posts:index']['count'], 1)
+
+
+class BenchmarkTests(TestCase):
+    def test_client_benchmark_report(self):
+        """Набор данных создаётся, отчёт содержит задержки и запросы."""
+        dataset = create_dataset(users=3, groups=2, posts=30)
+        self.assertEqual(Post.objects.count(), dataset['posts'])
+        results = run_benchmark(requests=5, drivers=('client',))
+        self.assertEqual(set(results['client']), {
+            'index', 'group_posts', 'profile', 'post_detail', 'post_create'})
+        for view, report in results['client'].items():
+            with self.subTest(view=view):
+                self.assertEqual(report['requests'], 5)
+                self.assertEqual(report['errors'], 0)
+                self.assertLessEqual(report['p50_ms'], report['p99_ms'])
+        self.assertEqual(Post.objects.count(), 35)
+
+
+class SQLiteTuningTests(TransactionTestCase):
+    def test_pragmas_applied_to_new_connections(self):
+        """Прагмы из SQLITE_PRAGMAS выставляются при подключении."""
+        pragmas = get_pragmas(connection, ['synchronous', 'busy_timeout'])
+        self.assertEqual(pragmas, {'synchronous': 1, 'busy_timeout': 5000})
+
+    def test_sqlite_profile_switches_settings(self):
+        """Профиль default отключает постоянные соединения и WAL,
+        после выхода настройки возвращаются."""
+        database = connection.settings_dict
+        with sqlite_profile('default') as applied:
+            self.assertEqual(applied['conn_max_age'], 0)
+            self.assertEqual(applied['synchronous'], 2)
+        self.assertEqual(database['CONN_MAX_AGE'], 60)
+        with sqlite_profile('tuned') as applied:
+            self.assertEqual(applied['cache_size'], -20000)
+
+
+calls = []
+
+
+@task(max_attempts=2)
+def remember(value):
+    calls.append(value)
+
+
+@task(max_attempts=2)
+def broken():
+    raise ValueError('сломано')
+
+
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_delay_and_run(self):
+        """Задача сохраняется в таблицу и выполняется воркером."""
+        queued = remember.delay(value=1)
+        self.assertEqual(queued.status, Task.PENDING)
+        self.assertEqual(calls, [])
+        self.assertEqual(run_pending(), 1)
+        self.assertEqual(calls, [1])
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.DONE)
+        self.assertEqual(run_pending(), 0)
+
+    def test_retries_then_fails(self):
+        """Упавшая задача откладывается, после max_attempts — FAILED."""
+        queued = broken.delay()
+        run_pending()
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.PENDING)
+        self.assertEqual(queued.attempts, 1)
+        self.assertGreater(queued.run_at, timezone.now())
+        self.assertIn('сломано', queued.last_error)
+        self.assertEqual(run_pending(), 0)
+        Task.objects.update(run_at=timezone.now())
+        with self.assertLogs('core.tasks', 'ERROR'):
+            run_pending()
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.FAILED)
+
+    def test_stale_running_task_is_taken_again(self):
+        """Задачу упавшего воркера берёт другой после TASKS_LOCK_TIMEOUT."""
+        remember.delay(value=2)
+        Task.objects.update(
+            status=Task.RUNNING,
+            locked_at=timezone.now() - timedelta(hours=1))
+        run_pending()
+        self.assertEqual(calls, [2])
+
+    @override_settings(TASKS_EAGER=True)
+    def test_eager_mode(self):
+        """В режиме TASKS_EAGER задача выполняется сразу."""
+        remember.delay(value=3)
+        self.assertEqual(calls, [3])
+
+    def test_run_worker_once(self):
+        """run_worker --once выполняет очередь и выходит."""
+        remember.delay(value=4)
+        out = StringIO()
+        call_command('run_worker', once=True, stdout=out)
+        self.assertEqual(calls, [4])
+        self.assertIn('Всего выполнено задач: 1', out.getvalue())
+
+
+class CountingBackend(EmailBackend):
+    """locmem-бэкенд, который считает открытые соединения и падает
+    на адресах из fail_for."""
+    opened = 0
+    fail_for = set()
+
+    def open(self):
+        CountingBackend.opened += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        for message in messages:
+            if set(message.to) & self.fail_for:
+                raise ConnectionError('SMTP недоступен')
+        return super().send_messages(messages)
+
+
+@override_settings(
+    EMAIL_BACKEND='core.mail.OutboxEmailBackend',
+    OUTBOX_EMAIL_BACKEND='core.tests.CountingBackend',
+    OUTBOX_BATCH_SIZE=2)
+class OutboxTests(TestCase):
+    def setUp(self):
+        CountingBackend.opened = 0
+        CountingBackend.fail_for = set()
+
+    def send(self, count, to='user{}@example.com'):
+        for i in range(count):
+            mail.send_mail('Тема', 'Текст', None, [to.format(i)])
+
+    def test_send_mail_only_queues(self):
+        """Письмо сохраняется в таблицу, отправку ставит одна задача."""
+        self.send(3)
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(
+            OutboxMessage.objects.filter(
+                status=OutboxMessage.PENDING).count(), 3)
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_worker_sends_in_batches(self):
+        """Воркер отправляет письма пачками, одно соединение на пачку."""
+        self.send(5)
+        run_pending()
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(CountingBackend.opened, 3)
+        self.assertFalse(OutboxMessage.objects.exclude(
+            status=OutboxMessage.SENT).exists())
+        self.assertEqual(send_outbox(), (0, 0))
+
+    def test_failed_message_is_retried(self):
+        """Неотправленное письмо остаётся в очереди, задача повторится."""
+        CountingBackend.fail_for = {'user1@example.com'}
+        self.send(3)
+        run_pending()
+        self.assertEqual(len(mail.outbox), 2)
+        failed = OutboxMessage.objects.get(recipients='user1@example.com')
+        self.assertEqual(failed.status, OutboxMessage.PENDING)
+        self.assertEqual(failed.attempts, 1)
+        self.assertEqual(Task.objects.get().status, Task.PENDING)
+        CountingBackend.fail_for = set()
+        call_command('send_outbox', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_concurrent_senders_do_not_share_rows(self):
+        """Второй отправитель, выбравший те же письма до UPDATE первого,
+        ничего не получает."""
+        self.send(3)
+        first = claim_batch(10)
+        real_claimable = outbox.claimable
+        selects = iter([OutboxMessage.objects.all()])
+
+        def stale_select():
+            return next(selects, None) or real_claimable()
+
+        with mock.patch.object(outbox, 'claimable', stale_select):
+            second = claim_batch(10)
+        self.assertEqual(len(first), 3)
+        self.assertEqual(second, [])
+
+    def test_stale_sending_rows_are_reclaimed(self):
+        """Письма упавшего отправителя забираются после таймаута."""
+        self.send(2)
+        claim_batch(10)
+        self.assertEqual(claim_batch(10), [])
+        OutboxMessage.objects.update(
+            locked_at=timezone.now() - timedelta(
+                seconds=settings.OUTBOX_LOCK_TIMEOUT + 1))
+        self.assertEqual(len(claim_batch(10)), 2)
+
+    def test_password_reset_uses_outbox(self):
+        """Письмо сброса пароля не отправляется внутри запроса."""
+        User.objects.create_user(
+            username='auth', email='auth@example.com', password='Pass-12345')
+        response = self.client.post(
+            reverse('password_reset'), {'email': 'auth@example.com'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(mail.outbox, [])
+        run_pending()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('auth@example.com', mail.outbox[0].to)
+
+
+@override_settings(TEMPLATES=PRODUCTION_TEMPLATES)
+class TemplateWarmupTests(TestCase):
+    def test_warm_templates_fills_cached_loader(self):
+        """warm_templates компилирует все шаблоны в кеш загрузчика."""
+        count, _, errors = warm_templates()
+        self.assertEqual(errors, [])
+        self.assertIn('posts/index.html', template_names(get_engine()))
+        loader = get_engine().template_loaders[0]
+        self.assertEqual(len(loader.get_template_cache), count)
+
+    def test_copy_engine_toggles_cached_loader(self):
+        """copy_engine снимает и добавляет cached-загрузчик."""
+        engine = get_engine()
+        plain = copy_engine(engine, cached=False)
+        self.assertNotIn(CACHED_LOADER, repr(plain.loaders))
+        self.assertEqual(copy_engine(plain, cached=True).loaders,
+                         engine.loaders)
+
+    def test_command_benchmark(self):
+        """Команда warm_templates выводит время рендера с кешем и без."""
+        Post.objects.create(
+            text='Пост', author=User.objects.create_user(username='a'))
+        out = StringIO()
+        call_command('warm_templates', benchmark=True, repeat=2, stdout=out)
+        self.assertIn('Скомпилировано шаблонов', out.getvalue())
+        self.assertIn('cached', out.getvalue())
+
+
+@override_settings(DATABASE_REPLICAS=['replica'],
+                   DATABASE_REPLICA_CACHE_TIMEOUT=5)
+class ReplicaRouterTests(TestCase):
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+
+        @use_replica
+        def view(request):
+            return {
+                'post': self.router.db_for_read(Post),
+                'user': self.router.db_for_read(User),
+                'write': self.router.db_for_write(Post),
+                'timeout': cache_timeout(60),
+            }
+        self.view = view
+
+    def request(self, session=None):
+        request = RequestFactory().get('/')
+        request.session = session or {}
+        return request
+
+    def test_reads_inside_view_go_to_replica(self):
+        """В use_replica посты читаются с реплики, пользователи и запись —
+        с основной базы, кеш живёт не дольше отставания реплики."""
+        self.assertEqual(self.view(self.request()), {
+            'post': 'replica', 'user': 'default', 'write': 'default',
+            'timeout': 5})
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+        self.assertEqual(cache_timeout(60), 60)
+
+    def test_pinned_session_reads_primary(self):
+        """Закреплённая сессия читает с основной базы."""
+        result = self.view(self.request({PIN_SESSION_KEY: True}))
+        self.assertEqual(result['post'], 'default')
+
+    def test_migrations_skip_replicas(self):
+        self.assertFalse(self.router.allow_migrate('replica', 'posts'))
+        self.assertTrue(self.router.allow_migrate('default', 'posts'))
+
+    def test_post_create_pins_session(self):
+        """После создания поста сессия закреплена за основной базой."""
+        client = Client()
+        client.force_login(User.objects.create_user(username='writer'))
+        self.assertNotIn(PIN_SESSION_KEY, client.session)
+        client.post(reverse('posts:post_create'), {'text': 'Пост'})
+        self.assertTrue(client.session[PIN_SESSION_KEY])
+
+
+@override_settings(AUTH_USER_CACHE='default')
+class CachedSessionUserTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='reader', password='pass-1234')
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def tables_read(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        return ' '.join(query['sql'] for query in queries)
+
+    def test_warm_request_skips_session_and_user_queries(self):
+        """Повторный запрос не читает сессию и пользователя из базы."""
+        url = reverse('posts:post_create')
+        self.assertIn('FROM "auth_user"', self.tables_read(url))
+        sql = self.tables_read(url)
+        self.assertNotIn('FROM "django_session"', sql)
+        self.assertNotIn('FROM "auth_user"', sql)
+
+    def test_user_save_invalidates_cache(self):
+        """Смена пароля сбрасывает кеш, и старая сессия больше не входит."""
+        self.client.get(reverse('posts:post_create'))
+        self.assertIsNotNone(cache.get(user_cache_key(self.user.pk)))
+        self.user.set_password('pass-5678')
+        self.user.save()
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+        response = self.client.get(reverse('posts:post_create'))
+        self.assertEqual(response.status_code, 302)
+
+    @override_settings(AUTH_USER_CACHE=None)
+    def test_user_cache_disabled_by_default(self):
+        """Без общего кеша пользователь читается из базы каждый раз."""
+        url = reverse('posts:post_create')
+        self.client.get(url)
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+        self.assertIn('FROM "auth_user"', self.tables_read(url))
+
+    def test_model_backend_session_stays_valid(self):
+        """Сессия, открытая с ModelBackend, после перехода на кеширующий
+        бэкенд не разлогинивается."""
+        client = Client()
+        client.force_login(
+            self.user, backend='django.contrib.auth.backends.ModelBackend')
+        response = client.get(reverse('posts:post_create'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_session_profiles_benchmark(self):
+        """Кешированные сессия и пользователь экономят запросы."""
+        Post.objects.create(text='Пост', author=self.user)
+        results = run_session_profiles(requests=3, views=('index',))
+        queries = {
+            name: report['index']['queries_per_request']
+            for name, report in results.items()
+        }
+        self.assertLess(queries['cached_db'], queries['db'])
+        self.assertLess(queries['signed_cookies'], queries['db'])
+
+
+class StaticPipelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.static_root = tempfile.mkdtemp()
+        cls.settings_override = override_settings(
+            STATIC_ROOT=cls.static_root,
+            STATICFILES_STORAGE=(
+                'core.staticfiles.CompressedManifestStaticFilesStorage'),
+        )
+        cls.settings_override.enable()
+        call_command('build_static', stdout=StringIO())
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        shutil.rmtree(cls.static_root)
+        super().tearDownClass()
+
+    def get(self, url, **headers):
+        request = RequestFactory().get(url, **headers)
+        return serve(request, url[len(settings.STATIC_URL):])
+
+    def test_static_tag_uses_hashed_name(self):
+        """{% static %} выдаёт имя с хешем из манифеста."""
+        url = static('css/bootstrap.min.css')
+        self.assertRegex(
+            url, r'^/static/css/bootstrap\.min\.[0-9a-f]{12}\.css$')
+
+    def test_serves_precompressed_variant(self):
+        """Файл с хешем отдаётся сжатым и кешируется на год."""
+        url = static('css/bootstrap.min.css')
+        response = self.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Cache-Control'], IMMUTABLE_CACHE_CONTROL)
+        self.assertEqual(response['Content-Type'], 'text/css')
+        body = gzip.decompress(b''.join(response.streaming_content))
+        plain = self.get(url)
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertEqual(body, b''.join(plain.streaming_content))
+
+    def test_unhashed_name_gets_short_max_age(self):
+        response = self.get('/static/css/bootstrap.min.css')
+        self.assertEqual(
+            response['Cache-Control'],
+            f'public, max-age={settings.STATIC_MAX_AGE}')
+
+    def test_missing_file_is_404(self):
+        with self.assertRaises(Http404):
+            self.get('/static/css/missing.css')
+
+
+class CompressionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader')
+        Post.objects.create(text='Длинный пост ' * 50, author=cls.user)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_accepted_encodings(self):
+        request = RequestFactory().get(
+            '/', HTTP_ACCEPT_ENCODING='gzip;q=0.8, br;q=0, identity')
+        self.assertEqual(accepted_encodings(request), {'gzip', 'identity'})
+
+    def test_page_compressed_on_the_fly(self):
+        """Страница без кеша сжимается с уровнем из COMPRESSION_LEVELS."""
+        url = reverse('posts:index')
+        plain = self.client.get(url).content
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(
+            response['Content-Length'], str(len(response.content)))
+        self.assertEqual(gzip.decompress(response.content), plain)
+
+    @override_settings(COMPRESSION_MIN_LENGTH=10 ** 6)
+    def test_short_response_left_as_is(self):
+        response = self.client.get(
+            reverse('posts:index'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_streaming_response_compressed_by_chunks(self):
+        """Потоковый ответ сжимается по частям, без Content-Length."""
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(
+            reverse('posts:export'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        body = gzip.decompress(b''.join(response.streaming_content))
+        self.assertIn('Длинный пост'.encode(), body)
+
+    def test_compress_stream_flushes_by_size(self):
+        """Мелкие куски потока сжимаются почти как целое тело, а клиент
+        получает данные раз в STREAM_FLUSH_SIZE байт."""
+        rows = [f'{i},Пост номер {i},2022-04-19\n'.encode()
+                for i in range(5000)]
+        body = b''.join(rows)
+        chunks = list(compress_stream(iter(rows), 'gzip', 6))
+        self.assertEqual(gzip.decompress(b''.join(chunks)), body)
+        self.assertGreaterEqual(
+            len(chunks), len(body) // STREAM_FLUSH_SIZE)
+        self.assertLess(
+            len(b''.join(chunks)),
+            len(gzip.compress(body, compresslevel=6)) * 1.2)
@@ -0,0 +1,13 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponseBadRequest, JsonResponse
+
+from .metrics import summarize
+
+
+@staff_member_required
+def request_metrics(request):
+    try:
+        hours = float(request.GET.get('hours', 24))
+    except ValueError:
+        return HttpResponseBadRequest('Неверное число часов.')
+    return JsonResponse(summarize(hours=hours))
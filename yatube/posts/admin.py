@@ -1,6 +1,8 @@
 from django.contrib import admin
+from django.db.models.expressions import RawSQL
 
-from .models import Group, Post
+from .models import Follow, Group, Post
+from .search import build_match, fts_supported, match_ids_sql
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -10,6 +12,15 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        match = build_match(search_term)
+        if not match or not fts_supported():
+            return super().get_search_results(
+                request, queryset, search_term)
+        return queryset.filter(
+            pk__in=RawSQL(match_ids_sql(), (match,))), False
+
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group)
+admin.site.register(Follow)
@@ -0,0 +1,139 @@
+import hashlib
+import time
+from functools import wraps
+
+from core.compression import (choose_encoding, compress_variants,
+                              set_content_encoding)
+from core.routers import cache_timeout
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+
+PAGE_CACHE_PREFIX: str = 'feed-page'
+POST_COUNT_KEY: str = 'post-count'
+
+
+def feed_scope(name, value=None):
+    return name if value is None else f'{name}:{value}'
+
+
+def _hash(value):
+    # slug, username и курсор приходят из URL: в ключе только хеш.
+    return hashlib.md5(value.encode()).hexdigest()
+
+
+def _version_key(scope):
+    return f'{PAGE_CACHE_PREFIX}:version:{_hash(scope)}'
+
+
+def _now_version():
+    # Версия ленты — время её последнего изменения в миллисекундах.
+    # Она не совпадёт со старой, даже если ключ версии был вытеснен.
+    return int(time.time() * 1000)
+
+
+def get_scope_version(scope):
+    version = cache.get(_version_key(scope))
+    if version is None:
+        version = _now_version()
+        cache.set(_version_key(scope), version, None)
+    return version
+
+
+def invalidate_scopes(*scopes):
+    """Сбрасывает все закешированные страницы перечисленных лент."""
+    for scope in scopes:
+        old = cache.get(_version_key(scope)) or 0
+        cache.set(
+            _version_key(scope), max(_now_version(), old + 1), None)
+
+
+def get_page_key(scope, request):
+    version = get_scope_version(scope)
+    # ?cursor= (первая страница по курсору) и страница без параметров
+    # выглядят по-разному: отсутствие курсора не равно пустому курсору.
+    page = _hash(repr((request.GET.get('page'), request.GET.get('cursor'))))
+    return f'{PAGE_CACHE_PREFIX}:{_hash(scope)}:{version}:{page}'
+
+
+VALIDATOR_HEADERS = ('ETag', 'Last-Modified')
+
+
+def set_validators(response, validators):
+    """validators — (ETag в кавычках, Last-Modified в секундах или None)."""
+    etag, last_modified = validators
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified)
+
+
+def cached_page_response(request, content, content_type, variants, headers):
+    encoding = choose_encoding(request, tuple(variants))
+    response = HttpResponse(
+        variants[encoding] if encoding else content,
+        content_type=content_type)
+    for header, value in headers.items():
+        response[header] = value
+    if encoding:
+        set_content_encoding(response, encoding)
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+def cache_feed_page(name, kwarg=None):
+    """Кеширует страницу ленты целиком для анонимных пользователей.
+
+    Ключ строится из ленты (name и значение kwarg из URL), её версии
+    и номера страницы; invalidate_scopes сбрасывает версию ленты.
+    Рядом с телом хранятся его сжатые варианты: попадание в кеш отдаёт
+    готовые байты без сжатия на каждый запрос. Валидаторы страницы
+    (feed_condition) тоже сохраняются: попадание не обращается к базе.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+            scope = feed_scope(name, kwargs.get(kwarg))
+            key = get_page_key(scope, request)
+            cached = cache.get(key)
+            if cached is not None:
+                return cached_page_response(request, *cached)
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming:
+                get_validators = getattr(request, 'get_feed_validators', None)
+                validators = get_validators and get_validators()
+                if validators:
+                    set_validators(response, validators)
+                headers = {
+                    header: response[header]
+                    for header in VALIDATOR_HEADERS
+                    if response.has_header(header)
+                }
+                cache.set(
+                    key,
+                    (response.content, response['Content-Type'],
+                     compress_variants(response.content), headers),
+                    cache_timeout(settings.POSTS_PAGE_CACHE_TIMEOUT)
+                )
+            return response
+        return wrapper
+    return decorator
+
+
+def cached_post_count(post_list):
+    """Число всех постов для пагинатора главной без COUNT(*) на каждый
+    запрос: сбрасывается при создании и удалении поста и по таймауту."""
+    count = cache.get(POST_COUNT_KEY)
+    if count is None:
+        # Счётчик всей таблицы: без JOIN'ов, которые несёт post_list.
+        count = post_list.model._default_manager.count()
+        cache.set(POST_COUNT_KEY, count,
+                  cache_timeout(settings.POSTS_COUNT_CACHE_TIMEOUT))
+    return count
+
+
+def invalidate_post_count():
+    cache.delete(POST_COUNT_KEY)
@@ -0,0 +1,170 @@
+from datetime import datetime
+from functools import wraps
+
+from django.db.models import (Count, DateTimeField, Exists, IntegerField,
+                              Max, OuterRef, Subquery, Value)
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from django.views.decorators.http import condition
+from users.models import Profile
+
+from .cache import cached_post_count, set_validators
+from .models import Follow, Group, Post, User
+
+FEED_VALIDATORS_ATTR: str = 'feed_validators'
+
+
+def stamps_key(stamps):
+    return '-'.join(
+        str(value.timestamp()) if isinstance(value, datetime) else str(value)
+        for value in stamps)
+
+
+def make_etag(request, stamp):
+    # Страница зависит от пользователя: шапка и ссылка на редактирование.
+    return f'{request.user.pk or 0}-{stamp}'
+
+
+def last_updated(posts):
+    """Последнее изменение поста: по индексу (..., -updated), одна строка."""
+    return Subquery(posts.order_by('-updated').values('updated')[:1])
+
+
+def table_aggregate(queryset, aggregate, output_field):
+    """Агрегат по всей таблице подзапросом, без GROUP BY по pk.
+    MAX по индексированному полю SQLite берёт из индекса."""
+    return Subquery(
+        queryset.order_by().annotate(one=Value(1, IntegerField())).values(
+            'one').annotate(value=aggregate).values('value'),
+        output_field=output_field)
+
+
+def get_feed_state(request, name, value):
+    """(число постов, штамп, подписка) ленты одним запросом; None, если
+    ленты нет. Число постов — денормализованные счётчики, а для главной —
+    cached_post_count.
+
+    Штамп — последнее изменение поста ленты и того, что выводится рядом
+    с постами: имён авторов (Profile.name_changed) и групп
+    (Group.updated; для главной и их число — удалённая группа пропадает
+    из карточек).
+    """
+    names = table_aggregate(
+        Profile.objects.all(), Max('name_changed'), DateTimeField())
+    if name == 'index':
+        row = Post.objects.order_by('-updated').annotate(
+            names=names,
+            groups=table_aggregate(
+                Group.objects.all(), Max('updated'), DateTimeField()),
+            groups_count=table_aggregate(
+                Group.objects.all(), Count('pk'), IntegerField()),
+        ).values_list('updated', 'names', 'groups', 'groups_count').first()
+        return cached_post_count(Post.objects.all()), row or (), None
+    if name == 'group':
+        row = Group.objects.filter(slug=value).annotate(
+            last_updated=last_updated(Post.objects.filter(
+                group=OuterRef('pk'))),
+            names=names,
+        ).values_list(
+            'posts_count', 'last_updated', 'names', 'updated').first()
+        return row and (row[0], row[1:], None)
+    users = User.objects.filter(username=value).annotate(
+        last_updated=last_updated(Post.objects.filter(
+            author=OuterRef('pk'))))
+    fields = ['profile__posts_count', 'last_updated', 'profile__name_changed']
+    # Кнопка подписки на странице профиля зависит от читателя.
+    if request.user.is_authenticated:
+        users = users.annotate(is_following=Exists(Follow.objects.filter(
+            user=request.user.pk, author=OuterRef('pk'))))
+        fields.append('is_following')
+    row = users.values_list(*fields).first()
+    if row is None:
+        return None
+    return row[0], row[1:3], row[3] if len(row) > 3 else None
+
+
+def get_feed_validators(request, name, value):
+    """(ETag, Last-Modified) ленты, один раз на запрос."""
+    if not hasattr(request, FEED_VALIDATORS_ATTR):
+        state = get_feed_state(request, name, value)
+        validators = None
+        if state is not None:
+            posts_count, stamps, extra = state
+            stamp = max(
+                (value.timestamp() for value in stamps
+                 if isinstance(value, datetime)), default=0)
+            validators = (
+                quote_etag(make_etag(
+                    request, f'{posts_count}-{stamps_key(stamps)}-{extra}')),
+                int(stamp) or None,
+            )
+        setattr(request, FEED_VALIDATORS_ATTR, validators)
+    return getattr(request, FEED_VALIDATORS_ATTR)
+
+
+def feed_condition(name, kwarg=None):
+    """Условный GET для ленты: 304 без рендера.
+
+    Валидаторы строятся из данных ленты, а не из состояния кеша
+    процесса: число постов и штамп из get_feed_state. Проверка стоит
+    один запрос и делается, только если клиент прислал валидаторы;
+    страница из кеша лент отдаёт заголовки, сохранённые вместе с ней.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            value = kwargs.get(kwarg)
+            conditional = (
+                'HTTP_IF_NONE_MATCH' in request.META
+                or 'HTTP_IF_MODIFIED_SINCE' in request.META)
+            if conditional:
+                validators = get_feed_validators(request, name, value)
+                if validators is not None:
+                    etag, last_modified = validators
+                    response = get_conditional_response(
+                        request, etag=etag, last_modified=last_modified)
+                    if response is not None:
+                        set_validators(response, validators)
+                        return response
+            # cache_feed_page возьмёт валидаторы для страницы в кеше.
+            request.get_feed_validators = (
+                lambda: get_feed_validators(request, name, value))
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not response.has_header(
+                    'ETag'):
+                validators = get_feed_validators(request, name, value)
+                if validators is not None:
+                    set_validators(response, validators)
+            return response
+        return wrapper
+    return decorator
+
+
+def get_post_state(request, post_id):
+    """Дата изменения поста, счётчик постов автора и штампы имени
+    автора и группы одним запросом."""
+    if not hasattr(request, 'post_state'):
+        request.post_state = Post.objects.filter(pk=post_id).values_list(
+            'updated', 'author__profile__posts_count',
+            'author__profile__name_changed', 'group__updated').first()
+    return request.post_state
+
+
+def post_etag(request, post_id):
+    state = get_post_state(request, post_id)
+    if state is None:
+        return None
+    return make_etag(request, stamps_key(state))
+
+
+def post_last_modified(request, post_id):
+    state = get_post_state(request, post_id)
+    if state is None:
+        return None
+    return max(value for value in state if isinstance(value, datetime))
+
+
+post_condition = condition(
+    etag_func=post_etag, last_modified_func=post_last_modified)
@@ -0,0 +1,56 @@
+from django.db.models import Count, F
+from users.models import Profile, User
+
+from .models import Group
+
+
+def author_posts_count(author):
+    """Счётчик постов из профиля автора.
+
+    У пользователя без профиля (bulk_create, удалённый профиль)
+    счётчик никто не ведёт — число постов считается по факту.
+    """
+    try:
+        return author.profile.posts_count
+    except Profile.DoesNotExist:
+        return author.posts.count()
+
+
+def change_author_count(author_id, delta):
+    Profile.objects.filter(user_id=author_id).update(
+        posts_count=F('posts_count') + delta)
+
+
+def change_group_count(group_id, delta):
+    if group_id is not None:
+        Group.objects.filter(pk=group_id).update(
+            posts_count=F('posts_count') + delta)
+
+
+def recount_posts(author_ids=None, group_ids=None):
+    """Пересчитывает счётчики постов и возвращает число исправленных.
+
+    Без аргументов проверяются все авторы и группы.
+    """
+    users = User.objects.filter(profile__isnull=True)
+    if author_ids is not None:
+        users = users.filter(pk__in=author_ids)
+    Profile.objects.bulk_create(
+        Profile(user_id=pk) for pk in users.values_list('pk', flat=True))
+
+    profiles = Profile.objects.annotate(
+        actual=Count('user__posts')).exclude(posts_count=F('actual'))
+    if author_ids is not None:
+        profiles = profiles.filter(user_id__in=author_ids)
+    groups = Group.objects.annotate(
+        actual=Count('posts')).exclude(posts_count=F('actual'))
+    if group_ids is not None:
+        groups = groups.filter(pk__in=group_ids)
+
+    fixed = 0
+    for queryset in (profiles, groups):
+        model = queryset.model
+        for pk, actual in queryset.values_list('pk', 'actual'):
+            model.objects.filter(pk=pk).update(posts_count=actual)
+            fixed += 1
+    return fixed
@@ -0,0 +1,77 @@
+import csv
+import json
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Post
+
+CHUNK_SIZE: int = 2000
+# Поля совпадают с форматом import_posts.
+COLUMNS = ('id', 'text', 'pub_date', 'author', 'group')
+VALUES = ('id', 'text', 'pub_date', 'author__username', 'group__slug')
+
+
+def parse_bound(value, end=False):
+    """Дата или дата-время из фильтра; для end дата включается целиком.
+
+    Возвращает None для пустого значения, ValueError — для неверного.
+    """
+    if not value:
+        return None
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'Неверная дата: {value!r}')
+        if end:
+            day += timedelta(days=1)
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def export_rows(author=None, group=None, since=None, until=None):
+    """Строки постов без создания моделей, порциями по CHUNK_SIZE."""
+    posts = Post.objects.order_by('pk')
+    if author:
+        posts = posts.filter(author__username=author)
+    if group:
+        posts = posts.filter(group__slug=group)
+    since = parse_bound(since)
+    until = parse_bound(until, end=True)
+    if since:
+        posts = posts.filter(pub_date__gte=since)
+    if until:
+        posts = posts.filter(pub_date__lt=until)
+    return posts.values_list(*VALUES).iterator(chunk_size=CHUNK_SIZE)
+
+
+class Echo:
+    """Файлоподобный объект для csv.writer: возвращает строку наружу."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(COLUMNS)
+    for row in rows:
+        yield writer.writerow(
+            (row[0], row[1], row[2].isoformat(), row[3], row[4] or ''))
+
+
+def iter_jsonl(rows):
+    for row in rows:
+        record = dict(zip(COLUMNS, row))
+        record['pub_date'] = record['pub_date'].isoformat()
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+FORMATS = {
+    'csv': (iter_csv, 'text/csv; charset=utf-8'),
+    'jsonl': (iter_jsonl, 'application/x-ndjson; charset=utf-8'),
+}
@@ -0,0 +1,95 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from core.testing import NO_CACHE, Rollback
+from posts.models import Group, Post, User
+from posts.utils import CURSOR_FORWARD, encode_cursor
+
+POSTS_TABLE: str = 'posts_post'
+# Полный проход по таблице или сортировка во временном B-tree.
+BAD_PLAN = re.compile(
+    rf'^SCAN (TABLE )?{POSTS_TABLE}(?! USING)|USE TEMP B-TREE FOR'
+)
+
+
+class Command(BaseCommand):
+    help = ('Выполняет EXPLAIN QUERY PLAN для запросов лент и падает, '
+            'если какой-то из них сканирует таблицу постов.')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Команда поддерживает только SQLite.')
+        self.verbosity = options['verbosity']
+        failures = []
+        try:
+            with transaction.atomic(), override_settings(CACHES=NO_CACHE):
+                for view_name, url in self.get_urls():
+                    for sql, params in self.capture(url):
+                        failures += self.explain(view_name, sql, params)
+                raise Rollback
+        except Rollback:
+            pass
+        if failures:
+            raise CommandError(
+                'Запросы сканируют таблицу постов:\n' + '\n'.join(failures))
+        if self.verbosity:
+            self.stdout.write(
+                self.style.SUCCESS('Все запросы лент по индексу.'))
+
+    def get_urls(self):
+        """Адреса лент; если база пуста, данные создаются в транзакции,
+        которая потом откатывается."""
+        post = Post.objects.for_cards().filter(
+            group__isnull=False).first()
+        if post is None:
+            author = User.objects.create_user(username='query-plan-author')
+            group = Group.objects.create(
+                title='query-plan', slug='query-plan-group', description='')
+            post = Post.objects.create(text='-', author=author, group=group)
+        feeds = {
+            'posts:index': reverse('posts:index'),
+            'posts:group_list': reverse(
+                'posts:group_list', args=(post.group.slug,)),
+            'posts:profile': reverse(
+                'posts:profile', args=(post.author.username,)),
+        }
+        cursor = encode_cursor(CURSOR_FORWARD, post.pub_date, post.pk)
+        for view_name, url in feeds.items():
+            yield view_name, url
+            yield view_name, url + '?page=2'
+            yield view_name, url + '?cursor='
+            yield view_name, url + f'?cursor={cursor}'
+        yield 'posts:post_detail', reverse(
+            'posts:post_detail', args=(post.pk,))
+
+    def capture(self, url):
+        queries = []
+
+        def wrapper(execute, sql, params, many, context):
+            queries.append((sql, params))
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(wrapper):
+            Client().get(url)
+        return [
+            (sql, params) for sql, params in queries
+            if sql.startswith('SELECT') and POSTS_TABLE in sql
+        ]
+
+    def explain(self, view_name, sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            details = [row[-1] for row in cursor.fetchall()]
+        if self.verbosity > 1:
+            self.stdout.write(f'{view_name}: {sql}')
+            for detail in details:
+                self.stdout.write(f'    {detail}')
+        return [
+            f'{view_name}: {detail}\n    {sql}'
+            for detail in details if BAD_PLAN.search(detail)
+        ]
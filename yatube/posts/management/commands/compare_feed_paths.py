@@ -0,0 +1,88 @@
+import time
+import tracemalloc
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+from core.testing import NO_CACHE, Rollback
+from posts.models import Post, User
+from posts.records import as_records
+from posts.utils import NUM_OF_PUBLICATIONS, CountedPaginator
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает ленту на моделях (select_related) и на PostRecord: '
+            'выделения памяти и время выборки с рендером страницы.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument(
+            '--per-page', type=int, default=NUM_OF_PUBLICATIONS)
+
+    def handle(self, *args, **options):
+        self.repeat = options['repeat']
+        self.per_page = options['per_page']
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        self.request = request
+        paths = {
+            'models': lambda: Post.objects.for_cards(),
+            'records': lambda: as_records(Post.objects.all()),
+        }
+        try:
+            with transaction.atomic(), override_settings(CACHES=NO_CACHE):
+                self.ensure_posts()
+                for name, build in paths.items():
+                    self.report(name, self.measure(build))
+                raise Rollback
+        except Rollback:
+            pass
+
+    def ensure_posts(self):
+        """Недостающие до страницы посты создаются в транзакции,
+        которая потом откатывается."""
+        missing = self.per_page - Post.objects.count()
+        if missing > 0:
+            author = User.objects.create_user(username='feed-paths-author')
+            Post.objects.bulk_create(
+                Post(text=f'Пост {i}', author=author) for i in range(missing))
+
+    def page(self, build):
+        return CountedPaginator(
+            build(), self.per_page, count=self.per_page).page(1)
+
+    def measure(self, build):
+        # Первый проход прогревает шаблоны и импорты.
+        self.render(self.page(build))
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        page = self.page(build)
+        posts = list(page.object_list)
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        blocks = sum(
+            stat.count_diff for stat in after.compare_to(before, 'filename'))
+        del posts
+
+        start = time.perf_counter()
+        for _ in range(self.repeat):
+            self.render(self.page(build))
+        elapsed = (time.perf_counter() - start) / self.repeat
+        return {'blocks': blocks, 'peak_kib': peak / 1024,
+                'page_ms': elapsed * 1000}
+
+    def render(self, page):
+        return render_to_string(
+            'posts/index.html', {'page_obj': page}, self.request)
+
+    def report(self, name, result):
+        self.stdout.write(
+            f'{name}: {result["blocks"]} блоков памяти на страницу, '
+            f'пик {result["peak_kib"]:.1f} КиБ, '
+            f'выборка и рендер {result["page_ms"]:.2f} мс'
+        )
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.export import FORMATS, export_rows
+
+
+class Command(BaseCommand):
+    help = ('Выгружает посты в CSV или JSONL потоком, '
+            'не загружая таблицу в память.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=FORMATS, default='csv')
+        parser.add_argument('--output', help='Файл; по умолчанию stdout.')
+        parser.add_argument('--author', help='username автора.')
+        parser.add_argument('--group', help='slug группы.')
+        parser.add_argument('--since', help='Дата или дата-время начала.')
+        parser.add_argument(
+            '--until', help='Дата или дата-время конца, включительно.')
+
+    def handle(self, *args, **options):
+        try:
+            rows = export_rows(
+                author=options['author'],
+                group=options['group'],
+                since=options['since'],
+                until=options['until'],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        writer, _ = FORMATS[options['format']]
+        output = (
+            open(options['output'], 'w', encoding='utf-8', newline='')
+            if options['output'] else self.stdout
+        )
+        try:
+            for chunk in writer(rows):
+                output.write(chunk)
+        finally:
+            if output is not self.stdout:
+                output.close()
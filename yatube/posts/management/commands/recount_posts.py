@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from posts.counters import recount_posts
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики постов у авторов и групп.'
+
+    def handle(self, *args, **options):
+        fixed = recount_posts()
+        self.stdout.write(
+            self.style.SUCCESS(f'Исправлено счётчиков: {fixed}.'))
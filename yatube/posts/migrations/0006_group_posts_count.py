@@ -0,0 +1,35 @@
+# Generated by Django 2.2.16 on 2026-10-18 05:41
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_posts_counts(apps, schema_editor):
+    User = apps.get_model('auth', 'User')
+    Profile = apps.get_model('users', 'Profile')
+    Group = apps.get_model('posts', 'Group')
+    Profile.objects.bulk_create(
+        Profile(user_id=pk, posts_count=count)
+        for pk, count in User.objects.filter(profile__isnull=True).annotate(
+            count=Count('posts')).values_list('pk', 'count')
+    )
+    for pk, count in Group.objects.annotate(
+            count=Count('posts')).values_list('pk', 'count'):
+        Group.objects.filter(pk=pk).update(posts_count=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0005_post_feed_indexes'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество постов'),
+        ),
+        migrations.RunPython(fill_posts_counts, migrations.RunPython.noop),
+    ]
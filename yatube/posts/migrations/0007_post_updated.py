@@ -0,0 +1,24 @@
+# Generated by Django 2.2.16 on 2026-10-18 06:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_group_posts_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='updated',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Дата изменения'),
+            preserve_default=False,
+        ),
+        migrations.RunSQL(
+            'UPDATE posts_post SET updated = pub_date',
+            migrations.RunSQL.noop
+        ),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+def install_fts(apps, schema_editor):
+    from posts.search import install_fts
+    install_fts(schema_editor.connection, rebuild=True)
+
+
+def uninstall_fts(apps, schema_editor):
+    from posts.search import uninstall_fts
+    uninstall_fts(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_post_updated'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_fts, uninstall_fts),
+    ]
@@ -1,6 +1,9 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import models
 
+from .records import as_records
+
 User = get_user_model()
 
 
@@ -8,12 +11,54 @@ class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=50, unique=True)
     description = models.TextField()
+    posts_count = models.PositiveIntegerField(
+        'Количество постов',
+        default=0,
+        editable=False
+    )
+    # Штамп для ETag лент и поста: заголовок и slug выводятся рядом
+    # с постами группы (posts.conditions).
+    updated = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True,
+        db_index=True
+    )
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        # posts_count правят только posts.counters атомарным UPDATE:
+        # сохранение группы не должно возвращать прочитанное значение.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'posts_count'
+            ]
+        super().save(*args, **kwargs)
+
+
+class PostQuerySet(models.QuerySet):
+    def for_cards(self):
+        """Модели постов с автором и группой для карточек."""
+        return self.select_related('author', 'group')
+
+    def for_feed(self):
+        """Посты лент: PostRecord при POSTS_FEED_RECORDS, иначе модели."""
+        if settings.POSTS_FEED_RECORDS:
+            return as_records(self)
+        return self.for_cards()
+
+    def for_detail(self):
+        """Пост со всем, что выводит post_detail: автор, его счётчик
+        постов и группа."""
+        return self.select_related('author__profile', 'group')
+
 
 class Post(models.Model):
+    # Группа, сохранённая в базе: по ней сигналы правят счётчики групп.
+    loaded_group_id = None
+
     text = models.TextField(
         'Текст поста',
         help_text='Введите текст поста'
@@ -22,6 +67,10 @@ class Post(models.Model):
         'Дата публикации',
         auto_now_add=True
     )
+    updated = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -38,8 +87,94 @@ class Post(models.Model):
         help_text='Группа, к которой будет относиться пост'
     )
 
+    objects = PostQuerySet.as_manager()
+
     class Meta:
-        ordering = ['-pub_date']
+        ordering = ['-pub_date', '-id']
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'], name='post_pub_date_idx'),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_pub_date_idx'),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_pub_date_idx'),
+            # Последнее изменение ленты для её ETag (posts.conditions).
+            models.Index(fields=['-updated'], name='post_updated_idx'),
+            models.Index(
+                fields=['group', '-updated'], name='post_group_updated_idx'),
+            models.Index(
+                fields=['author', '-updated'],
+                name='post_author_updated_idx'),
+        ]
 
     def __str__(self):
         return self.text
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.loaded_group_id = instance.__dict__.get('group_id')
+        return instance
+
+
+class Follow(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='follower',
+        verbose_name='Подписчик'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='following',
+        verbose_name='Автор'
+    )
+
+    class Meta:
+        verbose_name = 'Подписка'
+        verbose_name_plural = 'Подписки'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'author'], name='unique_follow'),
+            models.CheckConstraint(
+                check=~models.Q(user=models.F('author')),
+                name='no_self_follow'),
+        ]
+
+    def __str__(self):
+        return f'{self.user} → {self.author}'
+
+
+class TimelineEntry(models.Model):
+    """Пост в ленте подписок пользователя, записанный при публикации."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Читатель'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Пост'
+    )
+    # Копия Post.pub_date: лента читается одним диапазоном индекса.
+    pub_date = models.DateTimeField('Дата публикации')
+
+    class Meta:
+        ordering = ['-pub_date', '-id']
+        verbose_name = 'Запись ленты подписок'
+        verbose_name_plural = 'Записи ленты подписок'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'], name='unique_timeline_post'),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-id'],
+                name='timeline_user_pub_date_idx'),
+        ]
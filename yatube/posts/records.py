@@ -0,0 +1,106 @@
+from django.conf import settings
+from django.db.models import Model
+from django.db.models.query import ValuesListIterable
+
+# Поля, которые выводит includes/post.html, и ключ кеша карточки.
+FEED_FIELDS = (
+    'id', 'text', 'pub_date', 'updated',
+    'author_id', 'author__username', 'author__first_name',
+    'author__last_name',
+    'group_id', 'group__slug', 'group__title',
+)
+
+
+class Record:
+    """Запись только для чтения, равная экземпляру модели model_label
+    с тем же pk."""
+    __slots__ = ()
+    model_label = None
+
+    def __eq__(self, other):
+        if isinstance(other, type(self)):
+            return self.pk == other.pk
+        if isinstance(other, Model):
+            return (other._meta.label == self.model_label
+                    and other.pk == self.pk)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.pk)
+
+
+class AuthorRecord(Record):
+    __slots__ = ('pk', 'username', 'first_name', 'last_name')
+    model_label = settings.AUTH_USER_MODEL
+
+    def __init__(self, pk, username, first_name, last_name):
+        self.pk = pk
+        self.username = username
+        self.first_name = first_name
+        self.last_name = last_name
+
+    def __str__(self):
+        return self.username
+
+    def get_full_name(self):
+        return f'{self.first_name} {self.last_name}'.strip()
+
+    def get_username(self):
+        return self.username
+
+
+class GroupRecord(Record):
+    __slots__ = ('pk', 'slug', 'title')
+    model_label = 'posts.Group'
+
+    def __init__(self, pk, slug, title):
+        self.pk = pk
+        self.slug = slug
+        self.title = title
+
+    def __str__(self):
+        return self.title
+
+
+class PostRecord(Record):
+    """Пост ленты без экземпляров моделей."""
+    __slots__ = ('pk', 'text', 'pub_date', 'updated', 'author', 'group')
+    model_label = 'posts.Post'
+
+    def __init__(self, pk, text, pub_date, updated, author, group):
+        self.pk = pk
+        self.text = text
+        self.pub_date = pub_date
+        self.updated = updated
+        self.author = author
+        self.group = group
+
+    @property
+    def id(self):
+        return self.pk
+
+    def __str__(self):
+        return self.text
+
+
+class PostRecordIterable(ValuesListIterable):
+    def __iter__(self):
+        for (pk, text, pub_date, updated, author_id, username, first_name,
+             last_name, group_id, slug, title) in super().__iter__():
+            yield PostRecord(
+                pk, text, pub_date, updated,
+                AuthorRecord(author_id, username, first_name, last_name),
+                group_id and GroupRecord(group_id, slug, title),
+            )
+
+
+def as_records(post_list):
+    """QuerySet постов, который выбирает только FEED_FIELDS и отдаёт
+    PostRecord вместо моделей.
+
+    Остаётся QuerySet: фильтры, срезы, count() и курсорная пагинация
+    работают как раньше.
+    """
+    records = post_list.values_list(*FEED_FIELDS)
+    records._iterable_class = PostRecordIterable
+    return records
@@ -0,0 +1,142 @@
+import re
+
+from django.db import connection
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Post
+
+FTS_TABLE: str = 'posts_post_fts'
+SNIPPET_TOKENS: int = 20
+# Маркеры подсветки: управляющие символы не встречаются в тексте поста,
+# поэтому сниппет можно экранировать целиком и затем заменить их на <mark>.
+MARK_START: str = '\x02'
+MARK_END: str = '\x03'
+
+FTS_SQL = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        text, content='posts_post', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai
+        AFTER INSERT ON posts_post BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad
+        AFTER DELETE ON posts_post BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+        AFTER UPDATE OF text ON posts_post BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END""",
+)
+
+
+def fts_supported(using=connection):
+    return using.vendor == 'sqlite'
+
+
+def install_fts(using, rebuild=False):
+    """Создаёт индекс и триггеры, если их нет.
+
+    SQLite пересоздаёт таблицу постов при некоторых миграциях и теряет
+    триггеры, поэтому функция вызывается и после каждого migrate.
+    """
+    if not fts_supported(using):
+        return
+    if Post._meta.db_table not in using.introspection.table_names():
+        return
+    with using.cursor() as cursor:
+        for sql in FTS_SQL:
+            cursor.execute(sql)
+        if rebuild:
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def uninstall_fts(using):
+    if not fts_supported(using):
+        return
+    with using.cursor() as cursor:
+        for suffix in ('_ai', '_ad', '_au'):
+            cursor.execute(f'DROP TRIGGER IF EXISTS {FTS_TABLE}{suffix}')
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def build_match(query):
+    """Каждое слово запроса — префиксный терм; операторы FTS5
+    из пользовательского ввода не проходят."""
+    terms = re.findall(r'\w+', query)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def highlight(snippet):
+    return mark_safe(
+        escape(snippet)
+        .replace(MARK_START, '<mark>')
+        .replace(MARK_END, '</mark>')
+    )
+
+
+def match_ids_sql():
+    return f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s'
+
+
+class SearchResults:
+    """Результаты поиска для Paginator, отсортированные по bm25.
+
+    count() и каждый срез — отдельный запрос к индексу; у постов
+    страницы есть атрибут snippet с подсвеченными совпадениями.
+    """
+
+    def __init__(self, query):
+        self.match = build_match(query)
+
+    def count(self):
+        if not self.match:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COUNT(*) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s',
+                [self.match]
+            )
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        if not self.match:
+            return []
+        start = index.start or 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid, snippet({FTS_TABLE}, 0, %s, %s, %s, %s) '
+                f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                f'ORDER BY bm25({FTS_TABLE}) LIMIT %s OFFSET %s',
+                [MARK_START, MARK_END, '…', SNIPPET_TOKENS, self.match,
+                 index.stop - start, start]
+            )
+            rows = cursor.fetchall()
+        posts = Post.objects.for_cards().in_bulk(
+            [pk for pk, _ in rows])
+        results = []
+        for pk, snippet in rows:
+            if pk in posts:
+                posts[pk].snippet = highlight(snippet)
+                results.append(posts[pk])
+        return results
+
+
+def search_posts(query):
+    if fts_supported():
+        return SearchResults(query)
+    return Post.objects.for_cards().filter(
+        text__icontains=query)
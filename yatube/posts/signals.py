@@ -0,0 +1,144 @@
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+from users.models import Profile
+
+from .cache import feed_scope, invalidate_post_count, invalidate_scopes
+from .counters import change_author_count, change_group_count
+from .models import Group, Post, User
+from .tasks import fan_out_post
+
+
+def update_counters(post, created):
+    if created:
+        change_author_count(post.author_id, 1)
+        change_group_count(post.group_id, 1)
+        invalidate_post_count()
+    elif post.loaded_group_id != post.group_id:
+        change_group_count(post.loaded_group_id, -1)
+        change_group_count(post.group_id, 1)
+
+
+def invalidate_post_pages(post):
+    """Сбрасывает кеш страниц, на которых виден пост: главной,
+    старой и новой группы и профиля автора."""
+    group_ids = {post.loaded_group_id, post.group_id} - {None}
+    slugs = Group.objects.filter(pk__in=group_ids).values_list(
+        'slug', flat=True)
+    if Post.author.is_cached(post):
+        username = post.author.username
+    else:
+        username = User.objects.filter(pk=post.author_id).values_list(
+            'username', flat=True).first()
+    invalidate_scopes(
+        feed_scope('index'),
+        feed_scope('profile', username),
+        *(feed_scope('group', slug) for slug in slugs)
+    )
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    update_counters(instance, created)
+    invalidate_post_pages(instance)
+    if created:
+        # Запись в ленты всех подписчиков — в фоне, после коммита.
+        fan_out_post.delay(post_id=instance.pk)
+    instance.loaded_group_id = instance.group_id
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    change_author_count(instance.author_id, -1)
+    change_group_count(instance.loaded_group_id, -1)
+    invalidate_post_count()
+    invalidate_post_pages(instance)
+
+
+@receiver(pre_save, sender=Group)
+def remember_group_slug(sender, instance, raw=False, **kwargs):
+    instance.old_slug = None
+    if not raw and instance.pk is not None:
+        instance.old_slug = Group.objects.filter(pk=instance.pk).values_list(
+            'slug', flat=True).first()
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    old_slug = getattr(instance, 'old_slug', None)
+    if old_slug is None or old_slug == instance.slug:
+        invalidate_scopes(feed_scope('group', instance.slug))
+        return
+    # Ссылка на группу есть в карточках её постов во всех лентах;
+    # ключ карточки содержит slug, ETag — Group.updated.
+    usernames = User.objects.filter(posts__group=instance).values_list(
+        'username', flat=True).distinct()
+    invalidate_scopes(
+        feed_scope('index'),
+        feed_scope('group', old_slug),
+        feed_scope('group', instance.slug),
+        *(feed_scope('profile', username) for username in usernames)
+    )
+
+
+@receiver(pre_delete, sender=Group)
+def remember_group_authors(sender, instance, **kwargs):
+    # После удаления у постов уже не будет группы.
+    instance.author_names = list(User.objects.filter(
+        posts__group=instance).values_list('username', flat=True).distinct())
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    """Посты удалённой группы остаются без неё: ключ карточки содержит
+    slug, ETag главной — число групп; сбрасываем кеш страниц."""
+    invalidate_scopes(
+        feed_scope('index'),
+        feed_scope('group', instance.slug),
+        *(feed_scope('profile', username)
+          for username in getattr(instance, 'author_names', ()))
+    )
+
+
+AUTHOR_NAME_FIELDS = ('username', 'first_name', 'last_name')
+
+
+@receiver(pre_save, sender=User)
+def remember_author_name(sender, instance, raw=False, update_fields=None,
+                         **kwargs):
+    instance.author_name_changed = False
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and not set(update_fields) & set(
+            AUTHOR_NAME_FIELDS):
+        return
+    old = User.objects.filter(pk=instance.pk).values(
+        *AUTHOR_NAME_FIELDS).first()
+    instance.author_name_changed = old is not None and any(
+        old[field] != getattr(instance, field)
+        for field in AUTHOR_NAME_FIELDS
+    )
+    instance.old_username = old and old['username']
+
+
+@receiver(post_save, sender=User)
+def author_saved(sender, instance, created, raw=False, **kwargs):
+    """Имя автора есть в карточках его постов и в лентах с ними: ключ
+    карточки содержит имя, ETag — Profile.name_changed."""
+    if raw or not getattr(instance, 'author_name_changed', False):
+        return
+    Profile.objects.filter(user=instance).update(
+        name_changed=timezone.now())
+    slugs = Group.objects.filter(posts__author=instance).values_list(
+        'slug', flat=True).distinct()
+    invalidate_scopes(
+        feed_scope('index'),
+        feed_scope('profile', instance.old_username),
+        feed_scope('profile', instance.username),
+        *(feed_scope('group', slug) for slug in slugs)
+    )
@@ -0,0 +1,11 @@
+from core.tasks import task
+
+from .models import Post
+from .timeline import fan_out
+
+
+@task()
+def fan_out_post(post_id):
+    post = Post.objects.filter(pk=post_id).first()
+    if post is not None:
+        fan_out(post)
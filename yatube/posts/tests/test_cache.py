@@ -0,0 +1,230 @@
+import gzip
+import shutil
+import tempfile
+from http import HTTPStatus
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.tasks import run_pending
+from posts.models import Group, Post, User
+
+TEMP_CACHE_ROOT = tempfile.mkdtemp()
+
+
+class FeedPageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            description='Тестовое описание',
+            slug='test-slug'
+        )
+        cls.group_new = Group.objects.create(
+            title='Тестовый заголовок новый',
+            description='Тестовое описание новое',
+            slug='test-slug-new'
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый пост',
+            group=cls.group
+        )
+        cls.feeds = {
+            'index': reverse('posts:index'),
+            'group': reverse('posts:group_list', args=(cls.group.slug,)),
+            'group_new': reverse(
+                'posts:group_list', args=(cls.group_new.slug,)),
+            'profile': reverse('posts:profile', args=(cls.user.username,)),
+        }
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.author_authorized_client = Client()
+        self.author_authorized_client.force_login(self.user)
+
+    def get_pages(self):
+        return {
+            name: self.guest_client.get(url).content
+            for name, url in self.feeds.items()
+        }
+
+    def test_anonymous_page_served_from_cache(self):
+        """Повторный анонимный запрос ленты не обращается к базе."""
+        self.guest_client.get(self.feeds['index'])
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(self.feeds['index'])
+        self.assertContains(response, self.post.text)
+
+    def test_cached_page_served_precompressed(self):
+        """Из кеша отдаётся заранее сжатая страница без обращения к базе."""
+        plain = self.guest_client.get(self.feeds['index']).content
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(
+                self.feeds['index'], HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), plain)
+        response = self.guest_client.get(self.feeds['index'])
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_precompressed_hit_has_weak_etag(self):
+        """Сжатая страница из кеша отдаёт слабый ETag, как и сжатая
+        middleware, и по нему возвращается 304."""
+        url = self.feeds['index']
+        miss = self.guest_client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        hit = self.guest_client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertTrue(hit['ETag'].startswith('W/'))
+        self.assertEqual(hit['ETag'], miss['ETag'])
+        self.assertFalse(
+            self.guest_client.get(url)['ETag'].startswith('W/'))
+        response = self.guest_client.get(
+            url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=hit['ETag'])
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_authorized_user_bypasses_cache(self):
+        """Авторизованный пользователь получает свежую страницу."""
+        self.author_authorized_client.get(self.feeds['index'])
+        response = self.author_authorized_client.get(self.feeds['index'])
+        self.assertIsNotNone(response.context)
+
+    def test_pages_are_keyed_by_page_number(self):
+        """Разные страницы ленты кешируются отдельно."""
+        self.guest_client.get(self.feeds['index'])
+        response = self.guest_client.get(self.feeds['index'] + '?page=2')
+        self.assertIsNotNone(response.context)
+
+    def test_post_save_invalidates_only_affected_pages(self):
+        """Сохранение поста сбрасывает главную, старую и новую группу
+        и профиль автора, не трогая остальные ленты."""
+        other_group = Group.objects.create(
+            title='Другая группа', description='-', slug='other')
+        other_url = reverse('posts:group_list', args=(other_group.slug,))
+        self.get_pages()
+        self.guest_client.get(other_url)
+        with self.assertNumQueries(0):
+            self.get_pages()
+            self.guest_client.get(other_url)
+
+        Group.objects.filter(pk=other_group.pk).update(title='Изменено')
+        self.post.group = self.group_new
+        self.post.save()
+        for name, content in self.get_pages().items():
+            with self.subTest(name=name):
+                self.assertIsNotNone(content)
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(other_url)
+        self.assertNotContains(response, 'Изменено')
+        response = self.guest_client.get(self.feeds['group_new'])
+        self.assertContains(response, self.post.text)
+
+    def test_post_create_invalidates_feeds(self):
+        """Новый пост сразу виден анонимным пользователям."""
+        self.get_pages()
+        self.author_authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Совсем новый пост', 'group': self.group.pk}
+        )
+        pages = self.get_pages()
+        for name in ('index', 'group', 'profile'):
+            with self.subTest(name=name):
+                self.assertIn('Совсем новый пост', pages[name].decode())
+        self.assertNotIn('Совсем новый пост', pages['group_new'].decode())
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': TEMP_CACHE_ROOT,
+    }})
+    def test_filebased_backend(self):
+        """Кеш страниц работает и с файловым бэкендом."""
+        cache.clear()
+        self.guest_client.get(self.feeds['index'])
+        with self.assertNumQueries(0):
+            self.guest_client.get(self.feeds['index'])
+        self.post.save()
+        response = self.guest_client.get(self.feeds['index'])
+        self.assertIsNotNone(response.context)
+        shutil.rmtree(TEMP_CACHE_ROOT, ignore_errors=True)
+
+
+class PostCardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='auth', first_name='Лев', last_name='Толстой')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            description='Тестовое описание',
+            slug='test-slug'
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый пост',
+            group=cls.group
+        )
+        cls.group_url = reverse('posts:group_list', args=(cls.group.slug,))
+        cls.profile_url = reverse('posts:profile', args=(cls.user.username,))
+
+    def setUp(self):
+        cache.clear()
+        self.author_authorized_client = Client()
+        self.author_authorized_client.force_login(self.user)
+
+    def test_card_is_shared_between_feeds(self):
+        """Карточка поста рендерится один раз и переиспользуется
+        в других лентах."""
+        self.author_authorized_client.get(self.group_url)
+        Post.objects.filter(pk=self.post.pk).update(text='Без сигналов')
+        response = self.author_authorized_client.get(self.profile_url)
+        self.assertContains(response, 'Тестовый пост')
+        self.assertNotContains(response, 'Без сигналов')
+
+    def test_post_edit_refreshes_card(self):
+        """После post_edit карточка показывает новый текст."""
+        self.author_authorized_client.get(self.profile_url)
+        self.author_authorized_client.post(
+            reverse('posts:post_edit', args=(self.post.pk,)),
+            data={'text': 'Отредактированный пост', 'group': self.group.pk}
+        )
+        response = self.author_authorized_client.get(self.profile_url)
+        self.assertContains(response, 'Отредактированный пост')
+
+    def test_author_name_change_refreshes_card(self):
+        """Смена имени автора сбрасывает карточки его постов."""
+        self.author_authorized_client.get(reverse('posts:index'))
+        self.user.first_name = 'Алексей'
+        self.user.save()
+        run_pending()
+        response = self.author_authorized_client.get(reverse('posts:index'))
+        self.assertContains(response, 'Алексей Толстой')
+
+    def test_group_slug_change_refreshes_card(self):
+        """Смена slug группы обновляет ссылку в карточках её постов."""
+        self.author_authorized_client.get(reverse('posts:index'))
+        self.group.slug = 'renamed-slug'
+        self.group.save()
+        response = self.author_authorized_client.get(reverse('posts:index'))
+        self.assertContains(
+            response, reverse('posts:group_list', args=('renamed-slug',)))
+
+    def test_group_delete_refreshes_cards(self):
+        """После удаления группы карточки не ссылаются на неё, а главная
+        из кеша страниц обновляется."""
+        group = Group.objects.create(
+            title='Удаляемая группа', description='-', slug='doomed')
+        Post.objects.create(author=self.user, text='Пост', group=group)
+        group_url = reverse('posts:group_list', args=(group.slug,))
+        guest_client = Client()
+        index_url = reverse('posts:index')
+        for client in (guest_client, self.author_authorized_client):
+            self.assertContains(client.get(index_url), group_url)
+        group.delete()
+        for client in (guest_client, self.author_authorized_client):
+            with self.subTest(client=client):
+                response = client.get(index_url)
+                self.assertNotContains(response, group_url)
@@ -0,0 +1,223 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+from users.models import Profile
+
+
+class CheckQueryPlansCommandTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            description='Тестовое описание',
+            slug='test-slug'
+        )
+        Post.objects.create(
+            author=cls.user,
+            text='Тестовый пост',
+            group=cls.group
+        )
+
+    def test_feed_queries_use_indexes(self):
+        """Запросы лент не сканируют таблицу постов; при verbosity=0
+        команда ничего не пишет."""
+        out = StringIO()
+        call_command('check_query_plans', verbosity=0, stdout=out)
+        self.assertEqual(out.getvalue(), '')
+        self.assertEqual(Post.objects.count(), 1)
+
+    def test_cached_pages_are_checked(self):
+        """Закешированная лента всё равно проверяется: команда
+        работает без кеша страниц."""
+        def checked_index_queries():
+            out = StringIO()
+            call_command('check_query_plans', verbosity=2, stdout=out)
+            return out.getvalue().count('posts:index: SELECT')
+
+        cache.clear()
+        cold = checked_index_queries()
+        cache.clear()
+        Client().get(reverse('posts:index'))
+        self.assertEqual(checked_index_queries(), cold)
+
+    def test_empty_database_is_rolled_back(self):
+        """Данные, созданные командой для пустой базы, откатываются."""
+        Post.objects.all().delete()
+        call_command('check_query_plans', verbosity=0)
+        self.assertFalse(Post.objects.exists())
+        self.assertFalse(Group.objects.filter(
+            slug='query-plan-group').exists())
+
+
+class RecountPostsCommandTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            description='Тестовое описание',
+            slug='test-slug'
+        )
+        Post.objects.create(author=cls.user, text='Пост', group=cls.group)
+
+    def test_recount_repairs_drift(self):
+        """recount_posts возвращает счётчики к реальным значениям."""
+        Profile.objects.filter(user=self.user).update(posts_count=7)
+        Group.objects.filter(pk=self.group.pk).update(posts_count=0)
+        out = StringIO()
+        call_command('recount_posts', stdout=out)
+        self.assertIn('2', out.getvalue())
+        self.assertEqual(Profile.objects.get(user=self.user).posts_count, 1)
+        self.assertEqual(Group.objects.get(pk=self.group.pk).posts_count, 1)
+
+
+class ImportPostsCommandTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            description='Тестовое описание',
+            slug='test-slug'
+        )
+        cls.tmp_dir = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(cls.tmp_dir, ignore_errors=True)
+
+    def write(self, name, content):
+        path = os.path.join(self.tmp_dir, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+        return path
+
+    def test_import_jsonl_in_batches(self):
+        """JSONL импортируется пачками, дата и группа сохраняются,
+        счётчики пересчитываются."""
+        rows = [
+            {'text': f'Пост {i}', 'author': 'auth', 'group': 'test-slug',
+             'pub_date': f'2020-01-0{i + 1}T10:00:00+00:00'}
+            for i in range(5)
+        ]
+        path = self.write(
+            'posts.jsonl', '\n'.join(json.dumps(row) for row in rows))
+        out = StringIO()
+        call_command('import_posts', path, batch_size=2, stdout=out)
+        self.assertIn('строк/с', out.getvalue())
+        posts = Post.objects.filter(group=self.group)
+        self.assertEqual(posts.count(), 5)
+        self.assertEqual(posts.last().pub_date.year, 2020)
+        self.assertEqual(Profile.objects.get(user=self.user).posts_count, 5)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 5)
+
+    def test_import_csv_creates_missing(self):
+        """CSV с --create-missing создаёт авторов и группы."""
+        path = self.write(
+            'posts.csv',
+            'text,author,group,pub_date\n'
+            'Первый,new-author,new-group,\n'
+            'Второй,auth,,\n'
+        )
+        call_command(
+            'import_posts', path, create_missing=True, stdout=StringIO())
+        author = User.objects.get(username='new-author')
+        self.assertEqual(author.profile.posts_count, 1)
+        self.assertTrue(Group.objects.filter(slug='new-group').exists())
+        self.assertTrue(Post.objects.filter(
+            text='Второй', author=self.user, group=None).exists())
+
+    def test_unknown_author_fails(self):
+        """Неизвестный автор без --create-missing — ошибка с номером
+        строки."""
+        path = self.write(
+            'posts.jsonl', json.dumps({'text': 'Пост', 'author': 'nobody'}))
+        with self.assertRaisesMessage(CommandError, 'Строка 1'):
+            call_command('import_posts', path, stdout=StringIO())
+        self.assertFalse(Post.objects.exists())
+
+    def test_failed_batch_keeps_counters_of_imported(self):
+        """Ошибка в поздней пачке не мешает пересчитать счётчики
+        для уже импортированных пачек."""
+        rows = [
+            {'text': 'Пост', 'author': 'auth', 'group': 'test-slug'},
+            {'text': 'Пост', 'author': 'auth', 'group': 'test-slug'},
+            {'text': '', 'author': 'auth'},
+        ]
+        path = self.write(
+            'posts.jsonl', '\n'.join(json.dumps(row) for row in rows))
+        with self.assertRaisesMessage(CommandError, 'Строка 3'):
+            call_command(
+                'import_posts', path, batch_size=2, stdout=StringIO())
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(Profile.objects.get(user=self.user).posts_count, 2)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 2)
+
+
+class ExportPostsCommandTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            description='Тестовое описание',
+            slug='test-slug'
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text='Пост, с запятой', group=cls.group)
+        Post.objects.create(author=cls.other, text='Чужой пост')
+
+    def test_export_csv_with_filters(self):
+        """CSV выгружается с заголовком и учитывает фильтры."""
+        out = StringIO()
+        call_command('export_posts', author='auth', stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(lines[0], 'id,text,pub_date,author,group')
+        self.assertEqual(len(lines), 2)
+        self.assertIn('"Пост, с запятой"', lines[1])
+        self.assertIn('test-slug', lines[1])
+
+    def test_export_round_trip_through_import(self):
+        """Выгрузка JSONL загружается обратно командой import_posts."""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, ignore_errors=True)
+        path = os.path.join(tmp_dir, 'posts.jsonl')
+        call_command(
+            'export_posts', format='jsonl', group='test-slug', output=path)
+        with open(path, encoding='utf-8') as file:
+            record = json.loads(file.readline())
+        self.assertEqual(record['text'], self.post.text)
+        self.assertEqual(record['author'], 'auth')
+        call_command('import_posts', path, stdout=StringIO())
+        self.assertEqual(
+            Post.objects.filter(text=self.post.text).count(), 2)
+
+    def test_date_range(self):
+        """Границы диапазона дат включаются, неверная дата — ошибка."""
+        Post.objects.filter(pk=self.post.pk).update(
+            pub_date='2020-05-01T12:00:00+00:00')
+        out = StringIO()
+        call_command(
+            'export_posts', since='2020-05-01', until='2020-05-01',
+            format='jsonl', stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 1)
+        with self.assertRaises(CommandError):
+            call_command('export_posts', since='вчера', stdout=StringIO())
@@ -0,0 +1,143 @@
+from http import HTTPStatus
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            description='Тестовое описание',
+            slug='test-slug'
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый пост',
+            group=cls.group
+        )
+        cls.feeds = [
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(cls.group.slug,)),
+            reverse('posts:profile', args=(cls.user.username,)),
+        ]
+        cls.detail_url = reverse('posts:post_detail', args=(cls.post.pk,))
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.author_authorized_client = Client()
+        self.author_authorized_client.force_login(self.user)
+
+    def test_feed_returns_304_without_render(self):
+        """Лента с совпавшим ETag отдаёт 304 одним запросом валидаторов,
+        без рендера."""
+        for url in self.feeds:
+            with self.subTest(url=url):
+                etag = self.guest_client.get(url)['ETag']
+                with self.assertNumQueries(1):
+                    response = self.guest_client.get(
+                        url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(
+                    response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_feed_if_modified_since(self):
+        """Лента отвечает 304 на If-Modified-Since."""
+        last_modified = self.guest_client.get(self.feeds[0])['Last-Modified']
+        response = self.guest_client.get(
+            self.feeds[0], HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_new_post_changes_feed_etag(self):
+        """Новый пост в ленте меняет ETag."""
+        etags = [self.guest_client.get(url)['ETag'] for url in self.feeds]
+        Post.objects.create(author=self.user, text='Пост', group=self.group)
+        for url, etag in zip(self.feeds, etags):
+            with self.subTest(url=url):
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_etag_depends_on_user(self):
+        """Гость и автор получают разные ETag."""
+        guest_etag = self.guest_client.get(self.feeds[0])['ETag']
+        response = self.author_authorized_client.get(
+            self.feeds[0], HTTP_IF_NONE_MATCH=guest_etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_post_detail_returns_304_until_edit(self):
+        """post_detail отдаёт 304, пока пост не отредактирован."""
+        etag = self.guest_client.get(self.detail_url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.guest_client.get(
+                self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        self.author_authorized_client.post(
+            reverse('posts:post_edit', args=(self.post.pk,)),
+            data={'text': 'Новый текст', 'group': self.group.pk}
+        )
+        response = self.guest_client.get(
+            self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, 'Новый текст')
+
+    def test_feed_etag_follows_data_not_cache_version(self):
+        """ETag ленты строится из данных: пост, о котором кеш этого
+        процесса не знает (другой воркер), тоже меняет его."""
+        etags = [self.guest_client.get(url)['ETag'] for url in self.feeds]
+        Post.objects.bulk_create([
+            Post(author=self.user, text='Пост', group=self.group)])
+        for url, etag in zip(self.feeds, etags):
+            with self.subTest(url=url):
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_author_rename_changes_post_etag(self):
+        """Смена имени автора меняет ETag поста."""
+        etag = self.guest_client.get(self.detail_url)['ETag']
+        self.user.first_name = 'Лев'
+        self.user.save()
+        response = self.guest_client.get(
+            self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, 'Лев')
+
+    def test_follow_changes_profile_etag(self):
+        """Подписка меняет ETag профиля для подписчика."""
+        reader = User.objects.create_user(username='reader')
+        client = Client()
+        client.force_login(reader)
+        url = self.feeds[2]
+        etag = client.get(url)['ETag']
+        client.get(reverse('posts:profile_follow', args=(self.user.username,)))
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_group_edit_changes_etags(self):
+        """Новый заголовок группы меняет ETag её ленты и поста в ней."""
+        urls = (self.feeds[1], self.detail_url)
+        etags = [self.guest_client.get(url)['ETag'] for url in urls]
+        self.group.title = 'Новый заголовок'
+        self.group.save()
+        for url, etag in zip(urls, etags):
+            with self.subTest(url=url):
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag)
+                self.assertContains(response, 'Новый заголовок')
+
+    def test_rename_author_without_posts_changes_profile_etag(self):
+        """Переименование автора без постов меняет ETag профиля."""
+        author = User.objects.create_user(username='empty')
+        url = reverse('posts:profile', args=(author.username,))
+        etag = self.guest_client.get(url)['ETag']
+        author.first_name = 'Лев'
+        author.save()
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'Лев')
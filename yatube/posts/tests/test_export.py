@@ -0,0 +1,62 @@
+import json
+
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+
+
+class ExportViewTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            description='Тестовое описание',
+            slug='test-slug'
+        )
+        for i in range(3):
+            Post.objects.create(
+                author=cls.user, text=f'Пост {i}', group=cls.group)
+        Post.objects.create(author=cls.staff, text='Пост без группы')
+
+    def setUp(self):
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+
+    def test_export_only_for_staff(self):
+        """Выгрузка недоступна анониму и обычному пользователю."""
+        user_client = Client()
+        user_client.force_login(self.user)
+        for client in (Client(), user_client):
+            with self.subTest(client=client):
+                response = client.get(reverse('posts:export'))
+                self.assertEqual(response.status_code, 302)
+
+    def test_export_streams_csv(self):
+        """CSV отдаётся потоком в виде вложения."""
+        response = self.staff_client.get(reverse('posts:export'))
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment', response['Content-Disposition'])
+        content = b''.join(response.streaming_content).decode()
+        self.assertEqual(len(content.splitlines()), 5)
+
+    def test_export_jsonl_filtered_by_group(self):
+        """JSONL фильтруется по группе, строки идут по возрастанию id."""
+        response = self.staff_client.get(
+            reverse('posts:export'), {'format': 'jsonl', 'group': 'test-slug'})
+        content = b''.join(response.streaming_content).decode()
+        records = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([r['text'] for r in records],
+                         ['Пост 0', 'Пост 1', 'Пост 2'])
+        self.assertEqual({r['group'] for r in records}, {'test-slug'})
+
+    def test_bad_parameters(self):
+        """Неизвестный формат и неверная дата дают 400."""
+        for params in ({'format': 'xml'}, {'since': '2020-13-45'}):
+            with self.subTest(params=params):
+                response = self.staff_client.get(
+                    reverse('posts:export'), params)
+                self.assertEqual(response.status_code, 400)
@@ -0,0 +1,127 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.tasks import run_pending
+from core.testing import QueryBudgetMixin
+from posts.models import Follow, Post, TimelineEntry, User
+from posts.timeline import fan_out
+from posts.utils import NUM_OF_PUBLICATIONS
+
+
+class FollowTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.old_post = Post.objects.create(
+            author=cls.author, text='Старый пост')
+
+    def setUp(self):
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def follow(self, username='author'):
+        return self.reader_client.get(
+            reverse('posts:profile_follow', args=[username]))
+
+    def timeline(self):
+        return list(
+            self.reader.timeline.values_list('post__text', flat=True))
+
+    def test_follow_and_unfollow(self):
+        """Подписка добавляет посты автора в ленту, отписка убирает."""
+        response = self.follow()
+        self.assertRedirects(
+            response, reverse('posts:profile', args=['author']))
+        self.assertTrue(Follow.objects.filter(
+            user=self.reader, author=self.author).exists())
+        self.assertEqual(self.timeline(), ['Старый пост'])
+        self.reader_client.get(
+            reverse('posts:profile_unfollow', args=['author']))
+        self.assertFalse(Follow.objects.exists())
+        self.assertEqual(self.timeline(), [])
+
+    def test_cannot_follow_self(self):
+        """На себя подписаться нельзя."""
+        self.follow('reader')
+        self.assertFalse(Follow.objects.exists())
+
+    def test_new_post_fans_out(self):
+        """Воркер кладёт новый пост в ленты подписчиков, но не
+        остальных."""
+        self.follow()
+        stranger = User.objects.create_user(username='stranger')
+        Post.objects.create(author=self.author, text='Новый пост')
+        self.assertEqual(self.timeline(), ['Старый пост'])
+        run_pending()
+        self.assertEqual(self.timeline(), ['Новый пост', 'Старый пост'])
+        self.assertFalse(stranger.timeline.exists())
+        response = self.reader_client.get(reverse('posts:follow_index'))
+        self.assertContains(response, 'Новый пост')
+
+    @override_settings(POSTS_TIMELINE_SIZE=3)
+    def test_timeline_is_capped(self):
+        """В ленте остаются только последние POSTS_TIMELINE_SIZE постов."""
+        self.follow()
+        for i in range(5):
+            Post.objects.create(author=self.author, text=f'Пост {i}')
+        run_pending()
+        self.assertEqual(self.timeline(), ['Пост 4', 'Пост 3', 'Пост 2'])
+
+    @override_settings(POSTS_TIMELINE_SIZE=3)
+    def test_fan_out_trims_only_full_timelines(self):
+        """Рассылка поста не удаляет ничего из лент, не достигших
+        лимита."""
+        self.follow()
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        with CaptureQueriesContext(connection) as queries:
+            fan_out(post)
+        self.assertFalse(any(
+            query['sql'].startswith('DELETE')
+            for query in queries.captured_queries))
+        self.assertEqual(self.timeline(), ['Новый пост', 'Старый пост'])
+
+    def test_follow_index_keyset_pages(self):
+        """Лента подписок листается курсором с постоянным числом
+        запросов."""
+        self.follow()
+        Post.objects.bulk_create(
+            Post(author=self.author, text=f'Пост {i}')
+            for i in range(NUM_OF_PUBLICATIONS * 2)
+        )
+        # bulk_create обходит сигналы: ленту досыпаем подпиской заново.
+        self.reader_client.get(
+            reverse('posts:profile_unfollow', args=['author']))
+        self.follow()
+        url = reverse('posts:follow_index')
+        response = self.reader_client.get(url)
+        page_obj = response.context['page_obj']
+        self.assertTrue(page_obj.is_keyset)
+        self.assertEqual(len(page_obj), NUM_OF_PUBLICATIONS)
+        seen = [entry.post_id for entry in page_obj]
+        while page_obj.has_next():
+            response = self.reader_client.get(
+                url, {'cursor': page_obj.next_cursor})
+            page_obj = response.context['page_obj']
+            seen += [entry.post_id for entry in page_obj]
+        self.assertEqual(seen, list(
+            Post.objects.order_by('-pub_date', '-id').values_list(
+                'pk', flat=True)))
+        self.assertQueryBudget(3, self.reader_client, url)
+
+    def test_follow_button(self):
+        """На чужом профиле есть кнопка подписки или отписки."""
+        url = reverse('posts:profile', args=['author'])
+        self.assertContains(
+            self.reader_client.get(url),
+            reverse('posts:profile_follow', args=['author']))
+        self.follow()
+        self.assertContains(
+            self.reader_client.get(url),
+            reverse('posts:profile_unfollow', args=['author']))
+        self.assertEqual(TimelineEntry.objects.count(), 1)
@@ -1,4 +1,14 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core import serializers
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from users.models import Profile
 
 from ..models import Group, Post, User
 
@@ -56,3 +66,89 @@ class PostModelTest(TestCase):
             with self.subTest(field=field):
                 self.assertEqual(
                     post._meta.get_field(field).help_text, expected_value)
+
+
+class PostCountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.group_new = Group.objects.create(
+            title='Новая группа',
+            slug='test-slug-new',
+            description='Тестовое описание',
+        )
+
+    def assertCounts(self, author_count, group_count, group_new_count):
+        self.user.profile.refresh_from_db()
+        self.group.refresh_from_db()
+        self.group_new.refresh_from_db()
+        self.assertEqual(self.user.profile.posts_count, author_count)
+        self.assertEqual(self.group.posts_count, group_count)
+        self.assertEqual(self.group_new.posts_count, group_new_count)
+
+    def test_counters_follow_create_edit_delete(self):
+        """Счётчики постов меняются при создании, смене группы
+        и удалении поста."""
+        post = Post.objects.create(
+            author=self.user, text='Тестовый пост', group=self.group)
+        self.assertCounts(1, 1, 0)
+        post = Post.objects.get(pk=post.pk)
+        post.group = self.group_new
+        post.save()
+        self.assertCounts(1, 0, 1)
+        post.text = 'Новый текст'
+        post.save()
+        self.assertCounts(1, 0, 1)
+        post.delete()
+        self.assertCounts(0, 0, 0)
+
+    def test_group_save_keeps_counter(self):
+        """Сохранение группы не затирает счётчик, изменённый после её
+        загрузки."""
+        group = Group.objects.get(pk=self.group.pk)
+        Post.objects.create(author=self.user, text='Пост', group=self.group)
+        group.description = 'Новое описание'
+        group.save()
+        self.assertCounts(1, 1, 0)
+        self.assertEqual(
+            Group.objects.get(pk=self.group.pk).description, 'Новое описание')
+
+    def test_group_counter_follows_author_cascade(self):
+        """Каскадное удаление автора уменьшает счётчик группы."""
+        author = User.objects.create_user(username='cascade')
+        Post.objects.create(author=author, text='Пост', group=self.group)
+        self.assertCounts(0, 1, 0)
+        author.delete()
+        self.assertCounts(0, 0, 0)
+
+
+class FixtureProfileTest(TransactionTestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+
+    def load(self, *objects):
+        path = os.path.join(self.tmp_dir, 'fixture.json')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(serializers.serialize('json', objects))
+        call_command('loaddata', path, verbosity=0, stdout=StringIO())
+
+    def test_loaddata_creates_missing_profile(self):
+        """loaddata без профиля создаёт его со счётчиком по факту."""
+        user = User(pk=10, username='fixture')
+        post = Post(pk=10, author=user, text='Пост из фикстуры',
+                    pub_date=timezone.now(), updated=timezone.now())
+        self.load(user, post)
+        self.assertEqual(Profile.objects.get(user_id=10).posts_count, 1)
+
+    def test_loaddata_keeps_profile_from_fixture(self):
+        """Профиль из той же фикстуры не дублируется."""
+        user = User(pk=10, username='fixture')
+        self.load(user, Profile(pk=10, user=user, posts_count=0))
+        self.assertEqual(Profile.objects.get(user_id=10).pk, 10)
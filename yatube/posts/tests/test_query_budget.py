@@ -0,0 +1,148 @@
+from http import HTTPStatus
+
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.testing import QueryBudgetMixin
+from posts.models import Group, Post, TimelineEntry, User
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Бюджеты запросов для всех адресов posts, users и about."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            description='Тестовое описание',
+            slug='test-slug'
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text='Тестовый пост', group=cls.group)
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+
+    def grow(self, size):
+        """Оставляет size постов от разных авторов, чтобы поймать N+1."""
+        Post.objects.exclude(pk=self.post.pk).delete()
+        for i in range(size - 1):
+            author, _ = User.objects.get_or_create(username=f'author{i}')
+            Post.objects.create(
+                author=author, text=f'Пост {i}', group=self.group)
+
+    def test_feed_budgets(self):
+        """Ленты укладываются в бюджет при любом числе постов."""
+        # Третий запрос — валидаторы ленты: число постов и их последнее
+        # изменение (posts.conditions).
+        cases = (
+            (reverse('posts:index'), 3),
+            (reverse('posts:group_list', args=['test-slug']), 3),
+            (reverse('posts:profile', args=['auth']), 3),
+            (reverse('posts:search') + '?q=Пост', 3),
+        )
+        for url, budget in cases:
+            self.assertBudgetStable(
+                budget, self.guest_client, url, self.grow,
+                status=HTTPStatus.OK)
+
+    @override_settings(POSTS_FEED_RECORDS=False)
+    def test_model_feed_budgets(self):
+        """for_feed() на моделях тоже подгружает автора и группу заранее."""
+        # Третий запрос — валидаторы ленты: число постов и их последнее
+        # изменение (posts.conditions).
+        cases = (
+            (reverse('posts:index'), 3),
+            (reverse('posts:group_list', args=['test-slug']), 3),
+            (reverse('posts:profile', args=['auth']), 3),
+        )
+        for url, budget in cases:
+            self.assertBudgetStable(
+                budget, self.guest_client, url, self.grow,
+                status=HTTPStatus.OK)
+
+    def test_authorized_feed_budgets(self):
+        """Сессия и пользователь добавляют ровно два запроса."""
+        self.assertBudgetStable(
+            5, self.authorized_client, reverse('posts:index'), self.grow,
+            status=HTTPStatus.OK)
+
+    def grow_timeline(self, size):
+        """Ставит в ленту подписок auth size постов разных авторов."""
+        self.grow(size)
+        TimelineEntry.objects.filter(user=self.user).delete()
+        TimelineEntry.objects.bulk_create(
+            TimelineEntry(user=self.user, post=post, pub_date=post.pub_date)
+            for post in Post.objects.all())
+
+    def test_follow_budgets(self):
+        """Лента подписок, подписка и отписка."""
+        self.assertBudgetStable(
+            3, self.authorized_client, reverse('posts:follow_index'),
+            self.grow_timeline, status=HTTPStatus.OK)
+        # Подписка пишет Follow и копирует посты автора в ленту.
+        cases = (
+            ('posts:profile_follow', 12),
+            ('posts:profile_unfollow', 7),
+        )
+        for name, budget in cases:
+            with self.subTest(name=name):
+                self.assertQueryBudget(
+                    budget, self.staff_client, reverse(name, args=['auth']),
+                    status=HTTPStatus.FOUND)
+
+    def test_post_write_budgets(self):
+        """Создание и редактирование поста через POST."""
+        data = {'text': 'Новый текст', 'group': self.group.pk}
+        # Запись, счётчики, задача рассылки и закрепление сессии
+        # за основной базой.
+        cases = (
+            ('posts:post_create', [], 14),
+            ('posts:post_edit', [self.post.pk], 13),
+        )
+        for name, args, budget in cases:
+            with self.subTest(name=name):
+                self.assertQueryBudget(
+                    budget, self.authorized_client, reverse(name, args=args),
+                    method='post', data=data, status=HTTPStatus.FOUND)
+
+    def test_post_budgets(self):
+        """Страницы поста, создания и редактирования."""
+        cases = (
+            (self.guest_client, 'posts:post_detail', [self.post.pk], 2),
+            (self.authorized_client, 'posts:post_detail', [self.post.pk], 4),
+            (self.authorized_client, 'posts:post_create', [], 3),
+            (self.authorized_client, 'posts:post_edit', [self.post.pk], 4),
+            (self.guest_client, 'posts:post_create', [], 0),
+        )
+        for client, name, args, budget in cases:
+            with self.subTest(name=name, budget=budget):
+                self.assertQueryBudget(
+                    budget, client, reverse(name, args=args))
+
+    def test_export_budget(self):
+        """Выгрузка читает посты одним запросом независимо от их числа."""
+        self.assertBudgetStable(
+            3, self.staff_client, reverse('posts:export'), self.grow,
+            status=HTTPStatus.OK)
+
+    def test_static_and_auth_pages(self):
+        """Страницы users и about."""
+        cases = (
+            (self.guest_client, 'about:author', 0),
+            (self.guest_client, 'about:tech', 0),
+            (self.guest_client, 'users:signup', 0),
+            (self.guest_client, 'users:login', 0),
+            (self.authorized_client, 'users:password_change', 2),
+            (self.authorized_client, 'users:password_change_done', 2),
+            (self.authorized_client, 'users:logout', 4),
+        )
+        for client, name, budget in cases:
+            with self.subTest(name=name):
+                self.assertQueryBudget(budget, client, reverse(name))
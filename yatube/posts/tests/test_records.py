@@ -0,0 +1,76 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+from posts.records import PostRecord, as_records
+from posts.utils import NUM_OF_PUBLICATIONS
+
+
+class PostRecordTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='auth', first_name='Лев', last_name='Толстой')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            description='Тестовое описание',
+            slug='test-slug'
+        )
+        for i in range(NUM_OF_PUBLICATIONS + 1):
+            Post.objects.create(
+                author=cls.user,
+                text=f'Тестовый пост {i}',
+                group=cls.group if i % 2 else None
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_records_match_models(self):
+        """Запись ленты равна модели и отдаёт те же поля."""
+        post = Post.objects.filter(group__isnull=False).first()
+        record = as_records(Post.objects.filter(pk=post.pk)).get()
+        self.assertIsInstance(record, PostRecord)
+        self.assertEqual(record, post)
+        self.assertEqual(record.group, self.group)
+        self.assertEqual(record.author, self.user)
+        self.assertEqual(record.author.get_full_name(), 'Лев Толстой')
+        self.assertEqual(
+            (record.text, record.pub_date, record.updated),
+            (post.text, post.pub_date, post.updated))
+        no_group = as_records(Post.objects.filter(group__isnull=True))
+        self.assertIsNone(no_group.first().group)
+
+    def test_feed_html_does_not_change(self):
+        """Ленты на записях и на моделях выглядят одинаково."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:index') + '?page=2',
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': 'auth'}),
+            reverse('posts:profile', kwargs={'username': 'auth'}) + '?cursor=',
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertIsInstance(
+                    response.context['page_obj'][0], PostRecord)
+                cache.clear()
+                with override_settings(POSTS_FEED_RECORDS=False):
+                    expected = self.guest_client.get(url)
+                self.assertIsInstance(
+                    expected.context['page_obj'][0], Post)
+                self.assertEqual(response.content, expected.content)
+
+    def test_compare_command(self):
+        """Команда сравнения печатает оба варианта ленты."""
+        out = StringIO()
+        call_command('compare_feed_paths', repeat=1, stdout=out)
+        self.assertIn('models:', out.getvalue())
+        self.assertIn('records:', out.getvalue())
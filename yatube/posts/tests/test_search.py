@@ -0,0 +1,87 @@
+from django.contrib.admin.sites import site
+from django.test import Client, RequestFactory, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+from posts.utils import NUM_OF_PUBLICATIONS
+
+
+class PostSearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            description='Тестовое описание',
+            slug='test-slug'
+        )
+        cls.rare = Post.objects.create(
+            author=cls.user,
+            text='Про котов немного и про <b>собак</b>',
+            group=cls.group
+        )
+        cls.frequent = Post.objects.create(
+            author=cls.user,
+            text='Коты, коты и ещё раз коты',
+        )
+        Post.objects.create(author=cls.user, text='Совсем другая тема')
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def search(self, query, **params):
+        response = self.guest_client.get(
+            reverse('posts:search'), {'q': query, **params})
+        return response, list(response.context['page_obj'])
+
+    def test_results_ranked_by_bm25(self):
+        """Пост с большим числом совпадений идёт первым."""
+        _, posts = self.search('кот')
+        self.assertEqual(
+            [post.pk for post in posts], [self.frequent.pk, self.rare.pk])
+
+    def test_snippet_highlights_match_and_escapes_text(self):
+        """Сниппет подсвечивает совпадение и экранирует текст поста."""
+        response, posts = self.search('собак')
+        self.assertEqual([post.pk for post in posts], [self.rare.pk])
+        self.assertContains(response, '<mark>собак</mark>')
+        self.assertContains(response, '&lt;b&gt;')
+
+    def test_index_follows_update_and_delete(self):
+        """Индекс обновляется при правке и удалении поста."""
+        post = Post.objects.get(pk=self.rare.pk)
+        post.text = 'Теперь про попугаев'
+        post.save()
+        self.assertEqual(self.search('собак')[1], [])
+        self.assertEqual(
+            [p.pk for p in self.search('попугаев')[1]], [post.pk])
+        post.delete()
+        self.assertEqual(self.search('попугаев')[1], [])
+
+    def test_query_syntax_is_not_passed_to_fts(self):
+        """Операторы FTS5 в запросе не ломают поиск."""
+        response, posts = self.search('кот" * (')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(posts), 2)
+
+    def test_results_are_paginated(self):
+        """Результаты делятся на страницы, ссылки сохраняют запрос."""
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'Кошка номер {i}')
+            for i in range(NUM_OF_PUBLICATIONS + 1)
+        )
+        response, posts = self.search('кошка')
+        self.assertEqual(len(posts), NUM_OF_PUBLICATIONS)
+        self.assertContains(response, '?q=%D0%BA%D0%BE%D1%88%D0%BA%D0%B0&')
+        _, posts = self.search('кошка', page=2)
+        self.assertEqual(len(posts), 1)
+
+    def test_admin_search_uses_index(self):
+        """Поиск в админке находит посты через индекс."""
+        admin_model = site._registry[Post]
+        request = RequestFactory().get('/admin/posts/post/')
+        queryset, use_distinct = admin_model.get_search_results(
+            request, Post.objects.all(), 'собак')
+        self.assertFalse(use_distinct)
+        self.assertEqual(list(queryset), [self.rare])
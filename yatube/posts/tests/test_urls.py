@@ -1,5 +1,6 @@
 from http import HTTPStatus
 
+from django.core.cache import cache
 from django.test import Client, TestCase
 
 from posts.models import Group, Post, User
@@ -24,6 +25,7 @@ class GroupURLTests(TestCase):
         )
 
     def setUp(self):
+        cache.clear()
         self.guest_client = Client()
         self.author_authorized_client = Client()
         self.author_authorized_client.force_login(self.user)
@@ -1,11 +1,17 @@
 from datetime import datetime
 
 from django import forms
-from django.test import Client, TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils.timezone import utc
 
+from posts.cache import cached_post_count
 from posts.models import Group, Post, User
-from posts.utils import NUM_OF_PUBLICATIONS
+from posts.utils import NUM_OF_PUBLICATIONS, elided_page_range
+from users.models import Profile
 
 
 NUM_OF_PUBLICATIONS_2ND_PAGE: int = 3
@@ -34,6 +40,7 @@ class PostViewsTests(TestCase):
         )
 
     def setUp(self):
+        cache.clear()
         self.guest_client = Client()
         self.author_authorized_client = Client()
         self.author_authorized_client.force_login(self.user)
@@ -162,6 +169,19 @@ class PostViewsTests(TestCase):
             reverse('posts:group_list', kwargs={'slug': self.group_new.slug}))
         self.assertEqual(len(response.context.get('page_obj').object_list), 0)
 
+    def test_author_without_profile(self):
+        """Профиль и пост автора без Profile открываются, число постов
+        считается по факту."""
+        Profile.objects.filter(user=self.user).delete()
+        pages = (
+            reverse('posts:profile', kwargs={'username': self.user.username}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id}),
+        )
+        for page in pages:
+            with self.subTest(page=page):
+                response = self.guest_client.get(page)
+                self.assertEqual(response.context['posts_count'], 1)
+
 
 class PaginatorViewsTest(TestCase):
     @classmethod
@@ -181,6 +201,9 @@ class PaginatorViewsTest(TestCase):
                 group=cls.group
             )
 
+    def setUp(self):
+        cache.clear()
+
     def test_first_page_contains_ten_records(self):
         templates_pages_names = [
             reverse('posts:index'),
@@ -203,3 +226,165 @@ class PaginatorViewsTest(TestCase):
             self.assertEqual(
                 len(response.context['page_obj']),
                 NUM_OF_PUBLICATIONS_2ND_PAGE)
+
+
+class PaginatorCountViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            description='Тестовое описание',
+            slug='test-slug'
+        )
+        for i in range(NUM_OF_PUBLICATIONS + NUM_OF_PUBLICATIONS_2ND_PAGE):
+            Post.objects.create(
+                author=cls.user,
+                text=f'Тестовый пост {i}',
+                group=cls.group
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.authorized_client.get(url)
+        counts = [q for q in queries if 'COUNT(*)' in q['sql'].upper()]
+        return response, counts
+
+    def test_index_count_is_cached(self):
+        """COUNT(*) главной выполняется один раз, новый пост его сбрасывает."""
+        url = reverse('posts:index')
+        _, counts = self.count_queries(url)
+        self.assertEqual(len(counts), 1)
+        response, counts = self.count_queries(url + '?page=2')
+        self.assertEqual(counts, [])
+        self.assertEqual(response.context['page_obj'].paginator.count, 13)
+        Post.objects.create(author=self.user, text='Новый пост')
+        response, counts = self.count_queries(url)
+        self.assertEqual(len(counts), 1)
+        self.assertEqual(response.context['page_obj'].paginator.count, 14)
+
+    def test_group_and_profile_use_counters(self):
+        """Группа и профиль берут число постов из счётчиков без COUNT."""
+        urls = (
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user.username}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response, counts = self.count_queries(url)
+                self.assertEqual(counts, [])
+                self.assertEqual(
+                    response.context['page_obj'].paginator.num_pages, 2)
+
+    def test_max_pages(self):
+        """Предел числа страниц отрезает дальние страницы."""
+        with self.settings(POSTS_MAX_PAGES=1):
+            response = self.authorized_client.get(
+                reverse('posts:index') + '?page=2')
+        page_obj = response.context['page_obj']
+        self.assertEqual(page_obj.paginator.num_pages, 1)
+        self.assertEqual(page_obj.number, 1)
+
+    def test_page_links_are_elided(self):
+        """Число ссылок пагинатора не зависит от числа страниц."""
+        Group.objects.filter(pk=self.group.pk).update(posts_count=100000)
+        response = self.authorized_client.get(
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}))
+        self.assertEqual(
+            response.context['page_obj'].paginator.num_pages, 10000)
+        self.assertContains(response, '?page=10000', count=2)
+        self.assertLess(response.content.decode().count('page-link'), 15)
+
+
+class ElidedPageRangeTest(SimpleTestCase):
+    def test_elided_page_range(self):
+        """Края, окно вокруг текущей страницы и многоточия."""
+        cases = (
+            (1, 1, [1]),
+            (4, 8, [1, 2, 3, 4, 5, 6, 7, 8]),
+            (1, 100, [1, 2, 3, '…', 100]),
+            (50, 100, [1, '…', 48, 49, 50, 51, 52, '…', 100]),
+            (100, 100, [1, '…', 98, 99, 100]),
+        )
+        for number, num_pages, expected in cases:
+            with self.subTest(number=number, num_pages=num_pages):
+                self.assertEqual(
+                    list(elided_page_range(number, num_pages)), expected)
+
+
+class KeysetPaginatorViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            description='Тестовое описание',
+            slug='test-slug'
+        )
+        for i in range(NUM_OF_PUBLICATIONS + NUM_OF_PUBLICATIONS_2ND_PAGE):
+            Post.objects.create(
+                author=cls.user,
+                text=f'Тестовый пост {i}',
+                group=cls.group
+            )
+        # Одинаковая дата у всех постов: порядок держится на id.
+        Post.objects.update(pub_date=datetime(2022, 4, 19, tzinfo=utc))
+        cls.expected_ids = list(
+            Post.objects.order_by('-pub_date', '-id').values_list(
+                'id', flat=True)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cursor_pages_follow_model_ordering(self):
+        """Курсорная пагинация отдаёт посты в порядке Meta.ordering
+        без пропусков и повторов."""
+        pages = [
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user.username}),
+        ]
+        for page in pages:
+            with self.subTest(page=page):
+                first = self.client.get(page + '?cursor=')
+                first_page = first.context['page_obj']
+                self.assertFalse(first_page.has_previous())
+                self.assertTrue(first_page.has_next())
+                second = self.client.get(
+                    page + f'?cursor={first_page.next_cursor}')
+                second_page = second.context['page_obj']
+                self.assertFalse(second_page.has_next())
+                self.assertEqual(
+                    len(second_page), NUM_OF_PUBLICATIONS_2ND_PAGE)
+                ids = [post.id for post in first_page]
+                ids += [post.id for post in second_page]
+                self.assertEqual(ids, self.expected_ids)
+                back = self.client.get(
+                    page + f'?cursor={second_page.previous_cursor}')
+                self.assertEqual(
+                    [post.id for post in back.context['page_obj']],
+                    self.expected_ids[:NUM_OF_PUBLICATIONS])
+
+    def test_cursor_page_skips_count_query(self):
+        """Курсорная пагинация не выполняет COUNT(*)."""
+        # Число постов для ETag главной берётся из кеша счётчика.
+        cached_post_count(Post.objects.all())
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('posts:index') + '?cursor=')
+        for query in queries.captured_queries:
+            self.assertNotIn('COUNT(*)', query['sql'])
+
+    def test_broken_cursor_returns_first_page(self):
+        """Битый курсор отдаёт первую страницу."""
+        response = self.client.get(reverse('posts:index') + '?cursor=%%%')
+        self.assertEqual(
+            [post.id for post in response.context['page_obj']],
+            self.expected_ids[:NUM_OF_PUBLICATIONS])
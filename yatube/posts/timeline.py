@@ -0,0 +1,95 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count
+
+from .models import Follow, TimelineEntry
+
+# Сколько пользователей обрезать одним запросом (лимит параметров SQLite).
+TRIM_CHUNK: int = 500
+TRIM_SQL = (
+    'DELETE FROM {table} WHERE id IN ('
+    'SELECT id FROM ('
+    'SELECT id, ROW_NUMBER() OVER ('
+    'PARTITION BY user_id ORDER BY pub_date DESC, id DESC) AS position '
+    'FROM {table} WHERE user_id IN ({users})'
+    ') WHERE position > %s)'
+)
+
+
+def over_limit(user_ids):
+    """Пользователи, в лентах которых больше POSTS_TIMELINE_SIZE постов."""
+    return list(
+        TimelineEntry.objects.filter(user_id__in=user_ids)
+        .order_by()
+        .values('user_id')
+        .annotate(size=Count('id'))
+        .filter(size__gt=settings.POSTS_TIMELINE_SIZE)
+        .values_list('user_id', flat=True)
+    )
+
+
+def trim(user_ids):
+    """Оставляет в лентах пользователей POSTS_TIMELINE_SIZE новых постов.
+
+    Удаление с ROW_NUMBER() нумерует всю ленту, поэтому выполняется
+    только для лент сверх лимита.
+    """
+    table = connection.ops.quote_name(TimelineEntry._meta.db_table)
+    deleted = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(user_ids), TRIM_CHUNK):
+            chunk = over_limit(user_ids[start:start + TRIM_CHUNK])
+            if not chunk:
+                continue
+            cursor.execute(
+                TRIM_SQL.format(
+                    table=table, users=', '.join(['%s'] * len(chunk))),
+                [*chunk, settings.POSTS_TIMELINE_SIZE])
+            deleted += cursor.rowcount
+    return deleted
+
+
+def fan_out(post):
+    """Записывает новый пост в ленты всех подписчиков автора."""
+    follower_ids = list(Follow.objects.filter(
+        author_id=post.author_id).values_list('user_id', flat=True))
+    if follower_ids:
+        TimelineEntry.objects.bulk_create(
+            [
+                TimelineEntry(user_id=pk, post=post, pub_date=post.pub_date)
+                for pk in follower_ids
+            ],
+            ignore_conflicts=True,
+        )
+        trim(follower_ids)
+    return len(follower_ids)
+
+
+def backfill(user, author):
+    """Добавляет в ленту нового подписчика последние посты автора."""
+    posts = author.posts.order_by('-pub_date', '-id').values_list(
+        'pk', 'pub_date')[:settings.POSTS_TIMELINE_SIZE]
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(user=user, post_id=pk, pub_date=pub_date)
+            for pk, pub_date in posts
+        ],
+        ignore_conflicts=True,
+    )
+    trim([user.pk])
+
+
+def follow(user, author):
+    """Подписывает user на author; False, если подписка уже была."""
+    with transaction.atomic():
+        _, created = Follow.objects.get_or_create(user=user, author=author)
+        if created:
+            backfill(user, author)
+    return created
+
+
+def unfollow(user, author):
+    with transaction.atomic():
+        deleted, _ = Follow.objects.filter(user=user, author=author).delete()
+        TimelineEntry.objects.filter(user=user, post__author=author).delete()
+    return bool(deleted)
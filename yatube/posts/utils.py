@@ -1,10 +1,184 @@
-from django.core.paginator import Paginator
+import base64
+import binascii
+
+from django.conf import settings
+from django.core.paginator import Page, Paginator
+from django.db.models import Q, QuerySet
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
 
 NUM_OF_PUBLICATIONS: int = 10
 
+CURSOR_PARAM: str = 'cursor'
+CURSOR_FORWARD: str = 'n'
+CURSOR_BACKWARD: str = 'p'
+KEYSET_ORDERING = ('-pub_date', '-id')
+
+PAGE_ELLIPSIS: str = '…'
+PAGES_ON_EACH_SIDE: int = 2
+PAGES_ON_ENDS: int = 1
+
+
+def encode_cursor(direction, pub_date, pk):
+    raw = f'{direction}|{pub_date.isoformat()}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Возвращает (direction, pub_date, pk) или None для битого курсора."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        direction, pub_date, pk = raw.split('|')
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if direction not in (CURSOR_FORWARD, CURSOR_BACKWARD) or not pub_date:
+        return None
+    return direction, pub_date, pk
+
+
+class KeysetPage:
+    """Страница ленты, выбранная по ключу (pub_date, id) без COUNT и OFFSET.
+
+    Повторяет интерфейс Page, который нужен шаблонам ленты.
+    """
+    is_keyset = True
+
+    def __init__(self, object_list, has_next, has_previous):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        if not self.object_list:
+            return ''
+        last = self.object_list[-1]
+        return encode_cursor(CURSOR_FORWARD, last.pub_date, last.pk)
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous:
+            return None
+        if not self.object_list:
+            return ''
+        first = self.object_list[0]
+        return encode_cursor(CURSOR_BACKWARD, first.pub_date, first.pk)
+
+
+def paginate_keyset(post_list, cursor, per_page=NUM_OF_PUBLICATIONS):
+    decoded = decode_cursor(cursor) if cursor else None
+    if decoded is None:
+        posts = list(post_list.order_by(*KEYSET_ORDERING)[:per_page + 1])
+        return KeysetPage(posts[:per_page], len(posts) > per_page, False)
+    direction, pub_date, pk = decoded
+    if direction == CURSOR_FORWARD:
+        posts = list(
+            post_list.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, id__lt=pk)
+            ).order_by(*KEYSET_ORDERING)[:per_page + 1]
+        )
+        return KeysetPage(posts[:per_page], len(posts) > per_page, True)
+    posts = list(
+        post_list.filter(
+            Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, id__gt=pk)
+        ).order_by('pub_date', 'id')[:per_page + 1]
+    )
+    has_previous = len(posts) > per_page
+    return KeysetPage(posts[:per_page][::-1], True, has_previous)
+
+
+def elided_page_range(number, num_pages, on_each_side=PAGES_ON_EACH_SIDE,
+                      on_ends=PAGES_ON_ENDS):
+    """Номера страниц вокруг текущей и по краям, пропуски — PAGE_ELLIPSIS.
+
+    Длина не зависит от числа страниц.
+    """
+    # Пороги как в Paginator.get_elided_page_range из Django 3.2:
+    # многоточие никогда не заменяет одну страницу.
+    if num_pages <= (on_each_side + on_ends) * 2:
+        yield from range(1, num_pages + 1)
+        return
+    if number > on_each_side + on_ends + 2:
+        yield from range(1, on_ends + 1)
+        yield PAGE_ELLIPSIS
+        yield from range(number - on_each_side, number + 1)
+    else:
+        yield from range(1, number + 1)
+    if number < num_pages - on_each_side - on_ends - 1:
+        yield from range(number + 1, number + on_each_side + 1)
+        yield PAGE_ELLIPSIS
+        yield from range(num_pages - on_ends + 1, num_pages + 1)
+    else:
+        yield from range(number + 1, num_pages + 1)
+
+
+class FeedPage(Page):
+    def elided_page_range(self):
+        return elided_page_range(self.number, self.paginator.num_pages)
+
+
+class CountedPaginator(Paginator):
+    """Paginator с подключаемым подсчётом и пределом числа страниц.
+
+    count — None для точного COUNT(*), готовое число (например,
+    денормализованный счётчик) или функция от object_list.
+    """
+    ELLIPSIS = PAGE_ELLIPSIS
+
+    def __init__(self, object_list, per_page, count=None, max_pages=None,
+                 **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_strategy = count
+        self.max_pages = max_pages
+
+    @cached_property
+    def count(self):
+        if self.count_strategy is None:
+            return super().count
+        if callable(self.count_strategy):
+            return self.count_strategy(self.object_list)
+        return self.count_strategy
+
+    @cached_property
+    def num_pages(self):
+        num_pages = super().num_pages
+        if self.max_pages:
+            return min(num_pages, self.max_pages)
+        return num_pages
+
+    def _get_page(self, *args, **kwargs):
+        return FeedPage(*args, **kwargs)
+
 
-def paginate_page(request, post_list):
-    paginator = Paginator(post_list, NUM_OF_PUBLICATIONS)
+def paginate_page(request, post_list, count=None):
+    if CURSOR_PARAM in request.GET and isinstance(post_list, QuerySet):
+        return paginate_keyset(post_list, request.GET.get(CURSOR_PARAM))
+    paginator = CountedPaginator(
+        post_list, NUM_OF_PUBLICATIONS, count=count,
+        max_pages=settings.POSTS_MAX_PAGES)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     return page_obj
@@ -1,25 +1,42 @@
+from core.routers import pin_primary, use_replica
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.utils.http import urlencode
 from users.models import User
 
+from .cache import cache_feed_page, cached_post_count
+from .conditions import feed_condition, post_condition
+from .counters import author_posts_count
+from .export import FORMATS, export_rows
 from .forms import PostForm
 from .models import Group, Post
-from .utils import paginate_page
+from .search import search_posts
+from .timeline import follow, unfollow
+from .utils import CURSOR_PARAM, paginate_keyset, paginate_page
 
 
+@use_replica
+@feed_condition('index')
+@cache_feed_page('index')
 def index(request):
-    post_list = Post.objects.select_related('group', 'author').all()
-    page_obj = paginate_page(request, post_list)
+    post_list = Post.objects.for_feed()
+    page_obj = paginate_page(request, post_list, count=cached_post_count)
     context = {
         'page_obj': page_obj,
     }
     return render(request, 'posts/index.html', context)
 
 
+@use_replica
+@feed_condition('group', 'slug')
+@cache_feed_page('group', 'slug')
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.all()
-    page_obj = paginate_page(request, post_list)
+    post_list = group.posts.for_feed()
+    page_obj = paginate_page(request, post_list, count=group.posts_count)
     context = {
         'page_obj': page_obj,
         'group': group,
@@ -27,25 +44,70 @@ def group_posts(request, slug):
     return render(request, 'posts/group_list.html', context)
 
 
+@use_replica
+@feed_condition('profile', 'username')
+@cache_feed_page('profile', 'username')
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    post_list = author.posts.select_related('group')
-    page_obj = paginate_page(request, post_list)
+    author = get_object_or_404(
+        User.objects.select_related('profile'), username=username)
+    post_list = author.posts.for_feed()
+    posts_count = author_posts_count(author)
+    page_obj = paginate_page(request, post_list, count=posts_count)
+    following = request.user.is_authenticated and author.following.filter(
+        user=request.user).exists()
     context = {
         'page_obj': page_obj,
         'author': author,
+        'posts_count': posts_count,
+        'following': following,
     }
     return render(request, 'posts/profile.html', context)
 
 
+@use_replica
+@post_condition
 def post_detail(request, post_id):
-    post = get_object_or_404(Post.objects.select_related(), id=post_id)
+    post = get_object_or_404(Post.objects.for_detail(), id=post_id)
     context = {
         'post': post,
+        'posts_count': author_posts_count(post.author),
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+def search(request):
+    query = request.GET.get('q', '').strip()
+    post_list = search_posts(query) if query else Post.objects.none()
+    page_obj = paginate_page(request, post_list)
+    context = {
+        'page_obj': page_obj,
+        'query': query,
+        'page_query': urlencode({'q': query}) + '&',
+    }
+    return render(request, 'posts/search.html', context)
+
+
+@staff_member_required
+def export(request):
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in FORMATS:
+        return HttpResponseBadRequest('Неизвестный формат.')
+    try:
+        rows = export_rows(
+            author=request.GET.get('author'),
+            group=request.GET.get('group'),
+            since=request.GET.get('since'),
+            until=request.GET.get('until'),
+        )
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    writer, content_type = FORMATS[export_format]
+    response = StreamingHttpResponse(writer(rows), content_type=content_type)
+    response['Content-Disposition'] = (
+        f'attachment; filename="posts.{export_format}"')
+    return response
+
+
 @login_required
 def post_create(request):
     form = PostForm(request.POST or None)
@@ -54,18 +116,45 @@ def post_create(request):
         return render(request, 'posts/create_post.html', context)
     post_create = form.save(commit=False)
     post_create.author = request.user
-    post_create.save()
+    with transaction.atomic():
+        post_create.save()
+    pin_primary(request)
     return redirect('posts:profile', username=request.user)
 
 
 @login_required
 def post_edit(request, post_id):
-    post = get_object_or_404(Post.objects.select_related(), id=post_id)
-    if post.author != request.user:
+    post = get_object_or_404(Post, id=post_id)
+    if post.author_id != request.user.pk:
         return redirect('posts:post_detail', post_id=post_id)
     form = PostForm(instance=post, data=request.POST or None)
     if form.is_valid():
-        form.save()
+        with transaction.atomic():
+            form.save()
+        pin_primary(request)
         return redirect('posts:post_detail', post_id=post_id)
     context = {'form': form, 'post': post, 'is_edit': True}
     return render(request, 'posts/create_post.html', context)
+
+
+@login_required
+def follow_index(request):
+    timeline = request.user.timeline.select_related(
+        'post__author', 'post__group')
+    page_obj = paginate_keyset(timeline, request.GET.get(CURSOR_PARAM))
+    return render(request, 'posts/follow.html', {'page_obj': page_obj})
+
+
+@login_required
+def profile_follow(request, username):
+    author = get_object_or_404(User, username=username)
+    if author != request.user:
+        follow(request.user, author)
+    return redirect('posts:profile', username=username)
+
+
+@login_required
+def profile_unfollow(request, username):
+    author = get_object_or_404(User, username=username)
+    unfollow(request.user, author)
+    return redirect('posts:profile', username=username)
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-18 06:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='name_changed',
+            field=models.DateTimeField(db_index=True, editable=False, null=True, verbose_name='Дата смены имени'),
+        ),
+    ]
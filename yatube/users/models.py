@@ -1,3 +1,29 @@
 from django.contrib.auth import get_user_model
+from django.db import models
 
 User = get_user_model()
+
+
+class Profile(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='profile',
+        verbose_name='Пользователь'
+    )
+    posts_count = models.PositiveIntegerField(
+        'Количество постов',
+        default=0,
+        editable=False
+    )
+    # Штамп для ETag лент и поста: имя автора выводится в карточках
+    # его постов (posts.conditions). Ставится сигналом posts.
+    name_changed = models.DateTimeField(
+        'Дата смены имени',
+        null=True,
+        editable=False,
+        db_index=True
+    )
+
+    def __str__(self):
+        return self.user.get_username()
@@ -0,0 +1,25 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import Profile, User
+
+
+def ensure_profile(user_id):
+    """Создаёт недостающий профиль со счётчиком по факту: посты
+    из фикстуры загружаются без сигналов."""
+    user = User.objects.filter(pk=user_id, profile__isnull=True).first()
+    if user is not None:
+        Profile.objects.create(user=user, posts_count=user.posts.count())
+
+
+@receiver(post_save, sender=User)
+def create_profile(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        # loaddata: профиль может прийти в той же фикстуре следующим
+        # объектом, поэтому проверяем его после загрузки.
+        user_id = instance.pk
+        transaction.on_commit(lambda: ensure_profile(user_id))
+        return
+    if created:
+        Profile.objects.create(user=instance)
@@ -16,7 +16,7 @@ ALLOWED_HOSTS = [
 
 INSTALLED_APPS = [
     'about',
-    'core',
+    'core.apps.CoreConfig',
     'users.apps.UsersConfig',
     'posts.apps.PostsConfig',
     'django.contrib.admin',
@@ -28,6 +28,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.metrics.RequestMetricsMiddleware',
+    'core.compression.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -59,6 +61,9 @@ TEMPLATES = [
     },
 ]
 
+# Компилировать все шаблоны при старте WSGI-процесса (см. warm_templates).
+TEMPLATES_WARMUP = False
+
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
 
@@ -66,9 +71,113 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # Соединение живёт между запросами потока, а не открывается заново.
+        'CONN_MAX_AGE': 60,
+    }
+}
+
+# Реплики для чтения лент и постов (core.routers.use_replica). Локально —
+# второй файл SQLite, который копирует manage.py sync_replica:
+# YATUBE_DB_REPLICA=replica.sqlite3.
+DATABASE_REPLICAS = []
+if os.getenv('YATUBE_DB_REPLICA'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.path.join(BASE_DIR, os.getenv('YATUBE_DB_REPLICA')),
+        'TEST': {'MIRROR': 'default'},
     }
+    DATABASE_REPLICAS.append('replica')
+
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+
+# Сколько секунд кешировать страницы и счётчики, прочитанные с реплики:
+# не дольше ожидаемого отставания реплики.
+DATABASE_REPLICA_CACHE_TIMEOUT = 5
+
+# Прагмы каждого нового соединения с SQLite (core.db.configure_sqlite).
+# WAL: читатели не ждут записи, а пишущий — читателей; при WAL
+# synchronous=NORMAL не теряет целостность, только последние коммиты
+# при отключении питания. cache_size в КиБ со знаком минус.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -20000,
+    'mmap_size': 128 * 1024 * 1024,
+    'busy_timeout': 5000,
+}
+
+
+# Бэкенд кеша выбирается настройкой: 'locmem' или 'filebased'.
+CACHE_BACKEND = os.getenv('YATUBE_CACHE_BACKEND', 'locmem')
+
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'filebased': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache'),
+    },
+}
+
+CACHES = {
+    'default': CACHE_BACKENDS[CACHE_BACKEND],
+}
+
+# Уровни сжатия ответов на лету (core.compression.CompressionMiddleware):
+# страницы из кеша лент и статика сжаты заранее и сюда не попадают.
+COMPRESSION_LEVELS = {'gzip': 6, 'br': 4}
+COMPRESSION_MIN_LENGTH = 200
+
+# Хранилище сессий: 'db', 'cached_db' (кеш, при промахе — база) или
+# 'signed_cookies' (данные в подписанной cookie, без запросов к базе).
+SESSION_STRATEGY = os.getenv('YATUBE_SESSION_STRATEGY', 'cached_db')
+
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
 }
 
+SESSION_ENGINE = SESSION_ENGINES[SESSION_STRATEGY]
+
+# Пользователь сессии читается из кеша (core.auth.CachedModelBackend),
+# кеш сбрасывается при сохранении пользователя. ModelBackend остаётся
+# в списке: сессии, открытые с ним, не разлогиниваются.
+AUTHENTICATION_BACKENDS = [
+    'core.auth.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
+# Алиас кеша пользователей сессии. Только общий для всех воркеров кеш
+# (memcached, redis): locmem сбрасывается лишь в одном процессе,
+# filebased пишет хеши паролей на диск. Пусто — кеш выключен.
+AUTH_USER_CACHE = os.getenv('YATUBE_AUTH_USER_CACHE') or None
+AUTH_USER_CACHE_TIMEOUT = 300
+
+# Сколько секунд хранить страницы лент для анонимных пользователей.
+POSTS_PAGE_CACHE_TIMEOUT = 60 * 5
+# Сколько секунд хранить число постов для пагинатора главной.
+POSTS_COUNT_CACHE_TIMEOUT = 60 * 10
+# Ленты выбирают только нужные карточке поля в PostRecord вместо моделей.
+POSTS_FEED_RECORDS = True
+# Сколько последних постов хранить в ленте подписок каждого пользователя.
+POSTS_TIMELINE_SIZE = 1000
+# Предел числа страниц в пагинаторе лент; None — без предела.
+POSTS_MAX_PAGES = None
+
+# Фоновые задачи: выполнять сразу в запросе (без воркера) или в run_worker.
+TASKS_EAGER = os.getenv('YATUBE_TASKS_EAGER') == '1'
+# Базовая задержка повтора упавшей задачи, секунд; растёт вдвое.
+TASKS_RETRY_DELAY = 10
+# Через сколько секунд задачу зависшего воркера можно взять снова.
+TASKS_LOCK_TIMEOUT = 60 * 5
+
+# Замеры запросов: число и время SQL, время шаблонов, размер ответа.
+REQUEST_METRICS_ENABLED = os.getenv('YATUBE_REQUEST_METRICS') == '1'
+# Сколько замеров копить в памяти перед записью в базу.
+REQUEST_METRICS_FLUSH_SIZE = 50
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -101,11 +210,27 @@ STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
 STATIC_URL = '/static/'
 
+# Сюда собирает статику manage.py build_static (collectstatic).
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+
+# Отдавать STATIC_ROOT самим приложением (core.staticfiles.serve);
+# max-age для файлов без хеша в имени.
+STATIC_SERVE = False
+STATIC_MAX_AGE = 3600
+
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 # LOGOUT_REDIRECT_URL = 'posts:index'
 
-#  подключаем движок filebased.EmailBackend
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# Письма складываются в таблицу core.OutboxMessage, запрос не ждёт отправки
+EMAIL_BACKEND = 'core.mail.OutboxEmailBackend'
+# Бэкенд, через который воркер отправляет письма из очереди
+OUTBOX_EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# Сколько писем отправлять через одно соединение
+OUTBOX_BATCH_SIZE = 100
+# После стольких неудачных попыток письмо помечается ошибочным
+OUTBOX_MAX_ATTEMPTS = 5
+# Через сколько секунд письмо упавшего отправителя снова берётся в работу
+OUTBOX_LOCK_TIMEOUT = 60 * 5
 # указываем директорию, в которую будут складываться файлы писем
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
@@ -0,0 +1,38 @@
+# Боевой профиль: DJANGO_SETTINGS_MODULE=yatube.settings_production.
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import SECRET_KEY, TEMPLATES
+
+DEBUG = False
+
+SECRET_KEY = os.getenv('YATUBE_SECRET_KEY', SECRET_KEY)
+
+ALLOWED_HOSTS = os.getenv(
+    'YATUBE_ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',')
+
+# Шаблоны читаются и разбираются один раз на процесс, а не на каждый
+# запрос; APP_DIRS заменён загрузчиком app_directories внутри cached.
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            **TEMPLATES[0]['OPTIONS'],
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+]
+
+# wsgi.py компилирует все шаблоны при старте процесса.
+TEMPLATES_WARMUP = True
+
+# Имена статики с хешем содержимого и сжатые варианты рядом с файлами:
+# manage.py build_static, затем их отдаёт core.staticfiles.serve.
+STATICFILES_STORAGE = 'core.staticfiles.CompressedManifestStaticFilesStorage'
+STATIC_SERVE = True
@@ -1,10 +1,17 @@
+from core.staticfiles import serve
+from django.conf import settings
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('auth/', include('users.urls')),
     path('auth/', include('django.contrib.auth.urls')),
+    path('core/', include('core.urls', namespace='core')),
     path('about/', include('about.urls', namespace='about')),
     path('', include('posts.urls', namespace='posts')),
 ]
+
+if settings.STATIC_SERVE:
+    urlpatterns.insert(0, re_path(
+        rf'^{settings.STATIC_URL.lstrip("/")}(?P<path>.*)$', serve))
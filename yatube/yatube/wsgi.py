@@ -1,7 +1,14 @@
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+if settings.TEMPLATES_WARMUP:
+    # Первый запрос каждого воркера не платит за разбор шаблонов;
+    # импорт после get_wsgi_application, когда приложения загружены.
+    from core.templating import warm_templates
+    warm_templates()